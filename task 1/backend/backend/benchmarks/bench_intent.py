@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for intent classification.
+
+Compares the compiled single-pass IntentEngine against the previous approach
+of lowercasing the message and scanning keyword lists twice per request
+(once for the fallback text, once for the suggestions). The engine is not
+faster than those substring scans, which run entirely in C; it costs a
+fraction of a microsecond more per message in exchange for word boundaries
+("fee" no longer matches "feel") and typo matching. The engine is built with
+the knowledge base vocabulary, as ChatbotService does.
+
+Run from the backend directory:
+    python -m benchmarks.bench_intent
+"""
+import timeit
+
+from services.intent import IntentEngine
+from services.knowledge_base import KnowledgeBase
+
+MESSAGES = [
+    "What programs do you offer?",
+    "How do I enroll in a course?",
+    "What is the cost of your programs?",
+    "Can you tell me about the course schedule?",
+    "I feel stuck at the same level in my career and want a breakthrough",
+    "How do I apply for the Master of Business Warfare?",
+    "hi",
+    "What progams are avialable for senior leaders?",
+]
+
+
+def legacy_classify(message: str) -> tuple:
+    """The original two keyword scans from ChatbotService"""
+    message_lower = message.lower()
+    if any(word in message_lower for word in ["program", "course", "offer", "available"]):
+        fallback = "programs"
+    elif any(word in message_lower for word in ["enroll", "apply", "join", "sign up"]):
+        fallback = "enrollment"
+    elif any(word in message_lower for word in ["cost", "price", "fee", "tuition", "payment"]):
+        fallback = "pricing"
+    elif any(word in message_lower for word in ["schedule", "duration", "time", "when"]):
+        fallback = "schedule"
+    else:
+        fallback = "general"
+
+    message_lower = message.lower()
+    if any(word in message_lower for word in ["program", "course"]):
+        suggestions = "programs"
+    elif any(word in message_lower for word in ["enroll", "apply"]):
+        suggestions = "enrollment"
+    else:
+        suggestions = "general"
+
+    return fallback, suggestions
+
+
+def main(number: int = 20000):
+    engine = IntentEngine(KnowledgeBase().snapshot.vocabulary)
+
+    print(f"{'message':<70} {'legacy':>10} {'engine':>10}")
+    for message in MESSAGES:
+        print(f"{message:<70} {legacy_classify(message)[0]:>10} {engine.classify(message):>10}")
+
+    legacy = timeit.timeit(lambda: [legacy_classify(m) for m in MESSAGES], number=number)
+    compiled = timeit.timeit(lambda: [engine.classify(m) for m in MESSAGES], number=number)
+    calls = number * len(MESSAGES)
+
+    print()
+    print(f"legacy keyword scans: {legacy / calls * 1e6:.2f} us/message")
+    print(f"compiled engine:      {compiled / calls * 1e6:.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Load test for the chat API against a local stub LLM.
+
+Starts the stub model server (benchmarks.stub_llm) and main:app in
+subprocesses, points the app at the stub through LLM_API_BASE (the normal
+LiteLLM path), drives concurrent multi-turn conversations and reports
+latency percentiles, throughput, conversation memory growth and event loop
+lag. Results are written as JSON so runs on different commits can be compared.
+
+Run from the backend folder:
+    python -m benchmarks.bench_load --users 50 --turns 4 --output load.json
+    python -m benchmarks.bench_load --stream --compare load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+OPENERS = [
+    "I want to reach the C-suite in five years. Where do I start?",
+    "I keep getting passed over for promotion. Which program fits me?",
+    "How do I deal with office politics without losing myself?",
+    "I am restarting my career after a break. Can Iron Lady help?",
+    "I run a small business and want to scale it. What do you suggest?",
+    "How can I negotiate a better salary?",
+]
+FOLLOW_UPS = [
+    "How long does that program take?",
+    "Is it online or in person?",
+    "What would I be able to do differently after it?",
+    "Can I talk to someone before I decide?",
+    "How does the community help afterwards?",
+]
+PERSONAS = ["a software engineer", "a sales manager", "a doctor", "a founder", "an HR lead"]
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if len(values) < 2:
+        value = values[0] * 1000 if values else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value, "mean_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "mean_ms": statistics.mean(values) * 1000,
+    }
+
+
+def _parse_metrics(text: str) -> Dict[str, float]:
+    """Flatten Prometheus text into {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def _histogram_quantile(before: Dict, after: Dict, name: str, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding quantile q of observations made between two scrapes"""
+    buckets = []
+    prefix = f'{name}_bucket{{le="'
+    for key, value in after.items():
+        if key.startswith(prefix):
+            le = key[len(prefix):-2]
+            bound = float("inf") if le == "+Inf" else float(le)
+            buckets.append((bound, value - before.get(key, 0)))
+    buckets.sort()
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    for bound, count in buckets:
+        if count >= q * total:
+            return bound
+    return None
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _start(module: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not become ready")
+
+
+async def _snapshot(client: httpx.AsyncClient, base: str, pid: int) -> Dict:
+    health = (await client.get(f"{base}/api/health")).json()
+    return {
+        "conversation_bytes": health["conversations"]["estimated_bytes"],
+        "conversations": health["conversations"]["conversations"],
+        "rss_bytes": _rss_bytes(pid),
+        "metrics": _parse_metrics((await client.get(f"{base}/metrics")).text),
+    }
+
+
+async def _send(client: httpx.AsyncClient, base: str, payload: Dict, stream: bool):
+    """Return (latency, time to first byte, conversation id) for one turn"""
+    started = time.perf_counter()
+    if not stream:
+        response = await client.post(f"{base}/api/chat", json=payload)
+        response.raise_for_status()
+        elapsed = time.perf_counter() - started
+        return elapsed, elapsed, response.json()["conversation_id"]
+
+    first_byte = None
+    conversation_id = None
+    event = None
+    async with client.stream("POST", f"{base}/api/chat/stream", json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "done":
+                conversation_id = json.loads(line[len("data: "):])["conversation_id"]
+    return time.perf_counter() - started, first_byte, conversation_id
+
+
+async def _user(client, base, rng, turns, think_time, stream, results):
+    persona = rng.choice(PERSONAS)
+    conversation_id = None
+    for turn in range(turns):
+        if turn == 0:
+            message = f"I am {persona}. {rng.choice(OPENERS)}"
+        else:
+            message = rng.choice(FOLLOW_UPS)
+        try:
+            latency, first_byte, conversation_id = await _send(
+                client, base, {"message": message, "conversation_id": conversation_id}, stream
+            )
+        except httpx.HTTPError as e:
+            results["errors"].append(type(e).__name__)
+            return
+        results["latencies"].append(latency)
+        results["first_bytes"].append(first_byte)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time * 2))
+
+
+async def run(args) -> Dict:
+    stub_env = {
+        "STUB_LATENCY_SECONDS": str(args.latency),
+        "STUB_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "STUB_ERROR_RATE": str(args.error_rate),
+    }
+    app_env = {
+        "LLM_API_BASE": f"http://127.0.0.1:{args.stub_port}/v1",
+        "AGENT_MODEL": "stub",
+        "WARMUP_ENABLED": "false",
+        "CONVERSATION_BACKEND": "memory",
+        # Every simulated user connects from the same address
+        "RATE_LIMIT_PER_MINUTE": "0",
+    }
+    stub = _start("benchmarks.stub_llm:app", args.stub_port, stub_env)
+    app = _start("main:app", args.app_port, app_env)
+    base = f"http://127.0.0.1:{args.app_port}"
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    try:
+        async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+            await _wait_ready(client, f"http://127.0.0.1:{args.stub_port}/docs")
+            await _wait_ready(client, f"{base}/api/health/ready")
+
+            before = await _snapshot(client, base, app.pid)
+            results = {"latencies": [], "first_bytes": [], "errors": []}
+            rng = random.Random(args.seed)
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                _user(client, base, random.Random(rng.random()), args.turns,
+                      args.think_time, args.stream, results)
+                for _ in range(args.users)
+            ])
+            elapsed = time.perf_counter() - started
+            after = await _snapshot(client, base, app.pid)
+    finally:
+        for process in (app, stub):
+            process.terminate()
+            process.wait(timeout=10)
+
+    lag_name = "ironlady_event_loop_lag_seconds"
+    lag_count = after["metrics"].get(f"{lag_name}_count", 0) - before["metrics"].get(f"{lag_name}_count", 0)
+    lag_sum = after["metrics"].get(f"{lag_name}_sum", 0) - before["metrics"].get(f"{lag_name}_sum", 0)
+    answers = {
+        key.split('"')[1]: value - before["metrics"].get(key, 0)
+        for key, value in after["metrics"].items()
+        if key.startswith("ironlady_answers_total{")
+    }
+
+    routes = {
+        key.split('"')[1]: value - before["metrics"].get(key, 0)
+        for key, value in after["metrics"].items()
+        if key.startswith("ironlady_routed_requests_total{")
+    }
+
+    max_lag = after["metrics"].get("ironlady_event_loop_lag_max_seconds", 0)
+
+    def _bound_ms(q):
+        bound = _histogram_quantile(before["metrics"], after["metrics"], lag_name, q)
+        return min(bound, max_lag) * 1000 if bound is not None else None
+
+    rss_growth = None
+    if before["rss_bytes"] is not None and after["rss_bytes"] is not None:
+        rss_growth = after["rss_bytes"] - before["rss_bytes"]
+
+    return {
+        "requests": len(results["latencies"]),
+        "errors": len(results["errors"]),
+        "duration_s": elapsed,
+        "rps": len(results["latencies"]) / elapsed,
+        "latency": _percentiles(results["latencies"]),
+        "first_byte": _percentiles(results["first_bytes"]),
+        "answers": answers,
+        "routes": routes,
+        "load_shed": after["metrics"].get("ironlady_load_shed_total", 0)
+        - before["metrics"].get("ironlady_load_shed_total", 0),
+        "conversations": after["conversations"],
+        "conversation_bytes_growth": after["conversation_bytes"] - before["conversation_bytes"],
+        "rss_bytes_growth": rss_growth,
+        "event_loop_lag": {
+            "mean_ms": lag_sum / lag_count * 1000 if lag_count else None,
+            "p99_ms_upper_bound": _bound_ms(0.99),
+            "max_ms": max_lag * 1000,
+        },
+    }
+
+
+def _flatten(data: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(previous: Dict, current: Dict):
+    old, new = _flatten(previous["results"]), _flatten(current["results"])
+    print(f"\nvs {previous.get('commit') or 'previous run'}:")
+    print(f"{'metric':<34} {'before':>12} {'after':>12} {'change':>9}")
+    for key, value in new.items():
+        if key not in old:
+            continue
+        change = f"{(value - old[key]) / old[key] * 100:+.1f}%" if old[key] else ""
+        print(f"{key:<34} {old[key]:>12.1f} {value:>12.1f} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=4, help="messages per conversation")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between turns")
+    parser.add_argument("--stream", action="store_true", help="use /api/chat/stream")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_load.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "compare")
+        },
+        "results": asyncio.run(run(args)),
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Memory benchmark for stored conversation history.
+
+Fills a ConversationStore with idle conversations built from knowledge base
+text and measures Python heap bytes per conversation (tracemalloc) as plain
+message dicts, compacted (role codes plus a contents tuple) and compacted
+with zlib, together with the time to pack and to expand one conversation
+again. Results are written as JSON to compare releases.
+
+Run from the backend folder:
+    python -m benchmarks.bench_memory --conversations 20000 --turns 6 --output memory.json
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks.bench_load import FOLLOW_UPS, OPENERS, _git_commit
+from services.conversation_store import CompactHistory, ConversationStore
+
+
+def _sentences(path: str) -> List[str]:
+    with open(path) as f:
+        data = json.load(f)
+
+    found = []
+
+    def walk(value):
+        if isinstance(value, str):
+            found.extend(part.strip() + "." for part in value.split(".") if len(part.strip()) > 20)
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return found
+
+
+def _conversation(rng: random.Random, sentences: List[str], turns: int) -> List[Dict]:
+    messages = []
+    for turn in range(turns):
+        question = rng.choice(OPENERS if turn == 0 else FOLLOW_UPS)
+        # Decoded so every conversation owns its strings, as it would after JSON parsing
+        messages.append({"role": "user", "content": question.encode().decode()})
+        reply = " ".join(rng.choice(sentences) for _ in range(rng.randint(3, 8)))
+        messages.append({"role": "assistant", "content": reply})
+    return messages
+
+
+def _measure(args, sentences: List[str], compact: bool, compress: bool) -> Dict:
+    # Same seed every run, so all variants hold the same conversations
+    rng = random.Random(args.seed)
+    gc.collect()
+    tracemalloc.start()
+    store = ConversationStore(max_entries=args.conversations + 1, max_bytes=1 << 40, compress=compress)
+    for index in range(args.conversations):
+        store[f"conversation-{index}"] = _conversation(rng, sentences, args.turns)
+
+    pack_seconds = None
+    if compact:
+        # Everything counts as idle for this run
+        store.compact_seconds = 1e-9
+        started = time.perf_counter()
+        store.compact()
+        pack_seconds = time.perf_counter() - started
+
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sample = next(iter(store._entries.values())).messages
+    expand_us = None
+    if isinstance(sample, CompactHistory):
+        started = time.perf_counter()
+        for _ in range(1000):
+            sample.expand()
+        expand_us = (time.perf_counter() - started) / 1000 * 1e6
+
+    stats = store.stats()
+    return {
+        "bytes_per_conversation": current / args.conversations,
+        "estimated_bytes_per_conversation": stats["estimated_bytes"] / args.conversations,
+        "pack_us_per_conversation": pack_seconds / args.conversations * 1e6 if pack_seconds else None,
+        "expand_us_per_conversation": expand_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=6, help="user/assistant exchanges per conversation")
+    parser.add_argument("--knowledge-base", default="data/knowledge_base.json")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_memory.json")
+    args = parser.parse_args()
+
+    sentences = _sentences(args.knowledge_base)
+    rng = random.Random(args.seed)
+    text_bytes = sum(
+        len(m["content"].encode())
+        for _ in range(args.conversations)
+        for m in _conversation(rng, sentences, args.turns)
+    )
+
+    results = {
+        "conversations": args.conversations,
+        "messages_per_conversation": args.turns * 2,
+        "text_bytes_per_conversation": text_bytes / args.conversations,
+        "dicts": _measure(args, sentences, compact=False, compress=False),
+        "compact": _measure(args, sentences, compact=True, compress=False),
+        "compact_zlib": _measure(args, sentences, compact=True, compress=True),
+    }
+    baseline = results["dicts"]["bytes_per_conversation"]
+    for name in ("compact", "compact_zlib"):
+        results[name]["saving_pct"] = (1 - results[name]["bytes_per_conversation"] / baseline) * 100
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Prompt prefill benchmark for provider-side context caching.
+
+Sends the same set of questions through ChatbotService with the prompt cache
+disabled and then enabled, and reports time to first token (a proxy for
+prompt prefill), billed prompt tokens and provider-reported cached tokens.
+Each stream is read to the end, since usage arrives on its final chunk.
+Needs real Vertex credentials (GOOGLE_APPLICATION_CREDENTIALS).
+
+Run from the backend folder:
+    python -m benchmarks.bench_prompt_cache --rounds 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from services.chatbot_service import ChatbotService
+from services.knowledge_base import KnowledgeBase
+
+QUESTIONS = [
+    "I want to reach the C-suite in five years. Where do I start?",
+    "I keep getting passed over for promotion. Which program fits me?",
+    "How do I deal with office politics without losing myself?",
+    "I am restarting my career after a break. Can Iron Lady help?",
+]
+
+
+async def run(service: ChatbotService, rounds: int) -> dict:
+    first_tokens = []
+    prompt_before = service.llm.prompt_tokens
+    cached_before = service.llm.cached_prompt_tokens
+
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            conversation = [{"role": "user", "content": question}]
+            started = time.perf_counter()
+            first_token = None
+            async for _ in service._stream_gemini_response(conversation):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+            first_tokens.append(first_token)
+
+    if service.llm.prompt_tokens == prompt_before:
+        raise SystemExit("The provider reported no token usage; the token columns would be meaningless")
+
+    return {
+        "requests": len(first_tokens),
+        "ttft_p50_ms": statistics.median(first_tokens) * 1000,
+        "ttft_mean_ms": statistics.mean(first_tokens) * 1000,
+        "prompt_tokens": service.llm.prompt_tokens - prompt_before,
+        "cached_prompt_tokens": service.llm.cached_prompt_tokens - cached_before,
+        "estimated_prompt_tokens": service.token_usage["last_prompt_tokens"],
+    }
+
+
+async def main(rounds: int):
+    service = ChatbotService(KnowledgeBase())
+    if not service.client_available:
+        raise SystemExit("Vertex credentials are required for this benchmark")
+
+    service.prompt_cache.enabled = False
+    baseline = await run(service, rounds)
+
+    service.prompt_cache.enabled = True
+    await service.prompt_cache.refresh(service.system_prompt)
+    if not service.prompt_cache.request_kwargs():
+        print(f"Prompt cache could not be created: {service.prompt_cache.last_error}")
+    cached = await run(service, rounds)
+
+    print(f"{'metric':<26} {'no cache':>12} {'cache':>12}")
+    for key in baseline:
+        print(f"{key:<26} {baseline[key]:>12.1f} {cached[key]:>12.1f}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    asyncio.run(main(parser.parse_args().rounds))
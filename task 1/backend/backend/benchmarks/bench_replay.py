@@ -0,0 +1,95 @@
+"""
+Deterministic end-to-end benchmark of ChatbotService using recorded LLM calls.
+
+First record a script of multi-turn conversations against a real provider
+(Vertex credentials, or LLM_API_BASE for an OpenAI-compatible endpoint), then
+replay it with the original token timings (--speed 1) or with the upstream
+time compressed to zero (--speed 0) to isolate the cost of prompt assembly,
+history handling and caching. Replays need no network.
+
+Run from the backend folder:
+    python -m benchmarks.bench_replay --record
+    python -m benchmarks.bench_replay --speed 0 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+CONVERSATIONS = [
+    [
+        "I want to reach the C-suite in five years. Where do I start?",
+        "How long does that program take?",
+        "What would I be able to do differently after it?",
+    ],
+    [
+        "I am restarting my career after a break. Can Iron Lady help?",
+        "Is it online or in person?",
+        "Can I talk to someone before I decide?",
+    ],
+    [
+        "I run a small business and want to scale it. What do you suggest?",
+        "How does the community help afterwards?",
+    ],
+]
+
+
+async def run(service, rounds: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        # Fresh caches each round so every round replays the same calls
+        service.answer_cache.invalidate()
+        for turns in CONVERSATIONS:
+            conversation_id = None
+            for message in turns:
+                turn_started = time.perf_counter()
+                result = await service.process_message(message, conversation_id)
+                latencies.append(time.perf_counter() - turn_started)
+                conversation_id = result["conversation_id"]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": statistics.quantiles(latencies, n=20)[18] * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main(args):
+    os.environ["LLM_TRANSPORT"] = "record" if args.record else "replay"
+    os.environ["LLM_REPLAY_SPEED"] = str(args.speed)
+    if args.path:
+        os.environ["LLM_RECORDINGS_PATH"] = args.path
+
+    # Imported after the environment is set so the client picks the transport up
+    from services.chatbot_service import ChatbotService
+    from services.knowledge_base import KnowledgeBase
+
+    service = ChatbotService(KnowledgeBase())
+    if args.record and not service.client_available:
+        raise SystemExit("Recording needs Vertex credentials or LLM_API_BASE")
+
+    result = await run(service, 1 if args.record else args.rounds)
+    await service.conversations.stop()
+
+    transport = service.llm.transport.stats()
+    for key, value in {**result, "hits": transport["hits"], "misses": transport["misses"]}.items():
+        print(f"{key:<10} {value:>10.1f}")
+    if transport["misses"]:
+        print("Some calls were not recorded; re-run with --record after prompt changes")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", action="store_true", help="call the provider and record")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay timing scale (1 = as recorded)")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--path", help="recordings archive (default LLM_RECORDINGS_PATH)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""
+Startup-time benchmark: time to import, time to ready and time to warm.
+
+Launches main:app under uvicorn several times and measures wall time from
+process spawn until /api/health answers, together with the in-process phase
+breakdown it reports. With --provider the app is given an LLM endpoint so
+the background provider import runs, and the run also waits for it to
+finish. The heaviest imports of `import main` are listed from -X importtime.
+Results are written as JSON to compare releases.
+
+Run from the backend folder:
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_load import _git_commit
+
+
+def _heaviest_imports(env: Dict[str, str], count: int) -> List[Dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only imports made directly by main, so nested modules are not counted twice
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            rows.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:count]
+
+
+def _one_run(env: Dict[str, str], port: int, wait_for_provider: bool) -> Dict:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        health = None
+        with httpx.Client(timeout=5) as client:
+            while time.perf_counter() - started < 60:
+                try:
+                    health = client.get(f"http://127.0.0.1:{port}/api/health").json()
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready = time.perf_counter() - started
+            if health is None:
+                raise SystemExit("App did not become ready within 60s")
+
+            warm = None
+            while wait_for_provider and time.perf_counter() - started < 60:
+                health = client.get(f"http://127.0.0.1:{port}/api/health").json()
+                if "provider_import" in health["startup"]["background_ms"]:
+                    warm = time.perf_counter() - started
+                    break
+                time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {"ready_s": ready, "warm_s": warm, "startup": health["startup"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--provider", action="store_true", help="configure an LLM endpoint")
+    parser.add_argument("--output", default="bench_startup.json")
+    args = parser.parse_args()
+
+    env = {**os.environ, "WARMUP_ENABLED": "false"}
+    if args.provider:
+        # Never called; it only makes the service import the provider stack
+        env.setdefault("LLM_API_BASE", "http://127.0.0.1:9/v1")
+
+    runs = [_one_run(env, args.port, args.provider) for _ in range(args.runs)]
+    ready = [run["ready_s"] for run in runs]
+    phases = {
+        name: statistics.median(run["startup"]["phases_ms"][name] for run in runs)
+        for name in runs[0]["startup"]["phases_ms"]
+    }
+
+    results = {
+        "runs": args.runs,
+        "spawn_to_ready_ms_median": statistics.median(ready) * 1000,
+        "spawn_to_ready_ms_max": max(ready) * 1000,
+        "in_process_ready_ms_median": statistics.median(
+            run["startup"]["ready_ms"] for run in runs
+        ),
+        "phases_ms_median": phases,
+        "heaviest_imports": _heaviest_imports(env, 8),
+    }
+    if args.provider:
+        results["spawn_to_warm_ms_median"] = statistics.median(run["warm_s"] for run in runs) * 1000
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
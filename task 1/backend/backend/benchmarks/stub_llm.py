@@ -0,0 +1,121 @@
+"""
+OpenAI-compatible stub model server for load tests.
+
+Serves /v1/chat/completions (streaming and non-streaming) with a configurable
+time to first token, token rate and error rate, so the backend can be driven
+through its normal LiteLLM path (LLM_API_BASE) without calling Vertex.
+
+Run from the backend folder:
+    python -m benchmarks.stub_llm --port 9100 --latency 0.3 --tokens-per-second 80
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_SECONDS = float(os.getenv("STUB_LATENCY_SECONDS", 0.3))
+JITTER_SECONDS = float(os.getenv("STUB_JITTER_SECONDS", 0.05))
+TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", 80))
+REPLY_TOKENS = int(os.getenv("STUB_REPLY_TOKENS", 60))
+ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", 0))
+
+WORDS = (
+    "Iron Lady helps ambitious women win with Business War Tactics and a bold "
+    "leadership mindset built for breakthrough careers"
+).split()
+
+app = FastAPI(title="Stub LLM")
+
+
+def _reply_tokens(max_tokens: int):
+    count = min(REPLY_TOKENS, max_tokens or REPLY_TOKENS)
+    return [WORDS[i % len(WORDS)] + " " for i in range(count)]
+
+
+def _usage(messages, completion_tokens: int) -> dict:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+async def _first_token_delay():
+    await asyncio.sleep(max(LATENCY_SECONDS + random.uniform(-JITTER_SECONDS, JITTER_SECONDS), 0))
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    if random.random() < ERROR_RATE:
+        return JSONResponse(
+            {"error": {"message": "stub upstream error", "type": "server_error"}},
+            status_code=503
+        )
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "stub")
+    tokens = _reply_tokens(body.get("max_tokens"))
+    usage = _usage(body.get("messages", []), len(tokens))
+
+    if not body.get("stream"):
+        await _first_token_delay()
+        await asyncio.sleep(len(tokens) / TOKENS_PER_SECOND)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    def chunk(delta: dict, finish_reason=None, **extra) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        await _first_token_delay()
+        yield chunk({"role": "assistant", "content": ""})
+        for token in tokens:
+            yield chunk({"content": token})
+            await asyncio.sleep(1 / TOKENS_PER_SECOND)
+        yield chunk({}, "stop", usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, help="seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--error-rate", type=float)
+    args = parser.parse_args()
+
+    LATENCY_SECONDS = args.latency if args.latency is not None else LATENCY_SECONDS
+    TOKENS_PER_SECOND = args.tokens_per_second or TOKENS_PER_SECOND
+    ERROR_RATE = args.error_rate if args.error_rate is not None else ERROR_RATE
+
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
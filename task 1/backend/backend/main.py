@@ -1,21 +1,73 @@
-from fastapi import FastAPI, HTTPException
+# Imported first so the startup report covers every other import
+from services.startup import StartupReport
+startup = StartupReport()
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import uvicorn
+import argparse
+import importlib.util
+import json
+import math
 from dotenv import load_dotenv
 import os
 
+startup.mark("import_framework")
+
+from services import metrics
+from services.admission import RateLimiter
+from services.batch import BatchRunner
+from services.chat_socket import ChatSocketSession
 from services.chatbot_service import ChatbotService
 from services.knowledge_base import KnowledgeBase
+from services.lifecycle import Lifecycle, DRAINING, SERVING, WARMING
+from services.static_responses import StaticResponses
+from services.warmup import AnswerWarmer
+
+startup.mark("import_services")
 
 # Load environment variables
 load_dotenv()
 
+
+def _on_provider_warmup(task):
+    if not task.cancelled() and task.exception() is None:
+        startup.record_background("provider_import", task.result())
+    if lifecycle.state == WARMING:
+        lifecycle.set(SERVING)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background maintenance tasks"""
+    lifecycle.watch_signals()
+    await chatbot_service.start()
+    if chatbot_service.provider_warmup is not None:
+        lifecycle.set(WARMING)
+        chatbot_service.provider_warmup.add_done_callback(_on_provider_warmup)
+    else:
+        lifecycle.set(SERVING)
+    answer_warmer.start()
+    loop_monitor.start()
+    startup.ready()
+    yield
+    # The server has stopped accepting connections and finished open requests
+    lifecycle.set(DRAINING)
+    await answer_warmer.stop()
+    await chatbot_service.drain(lifecycle.grace_seconds)
+    await loop_monitor.stop()
+    await chatbot_service.stop()
+
+
 app = FastAPI(
     title="Iron Lady Learning Assistant API",
     description="AI-powered chatbot for Iron Lady programs and services",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -27,9 +79,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+QUICK_QUESTIONS = [
+    "What programs do you offer?",
+    "How do I enroll in a course?",
+    "What are the prerequisites for leadership training?",
+    "Can you tell me about the course schedule?",
+    "What is the cost of your programs?",
+    "Do you offer any scholarships or financial aid?",
+    "How long are the programs?",
+    "What certifications will I receive?",
+]
+
 # Initialize services
 knowledge_base = KnowledgeBase()
+startup.mark("knowledge_base")
 chatbot_service = ChatbotService(knowledge_base)
+answer_warmer = AnswerWarmer(chatbot_service, lambda: QUICK_QUESTIONS)
+static_responses = StaticResponses()
+loop_monitor = metrics.LoopLagMonitor()
+lifecycle = Lifecycle()
+batch_runner = BatchRunner()
+rate_limiter = RateLimiter()
+startup.mark("services")
+
+
+def build_static_responses(snapshot):
+    """Pre-serialize endpoints that only change with the knowledge base"""
+    static_responses.set("root", json.dumps({
+        "message": "Iron Lady Learning Assistant API",
+        "version": "1.0.0",
+        "status": "running"
+    }).encode())
+    static_responses.set("quick_questions", json.dumps({"questions": QUICK_QUESTIONS}).encode())
+    static_responses.set("programs", snapshot.programs_payload)
+
+
+build_static_responses(knowledge_base.snapshot)
+knowledge_base.add_listener(build_static_responses)
+startup.mark("static_responses")
+
+# Gauges read live service state when /metrics is scraped
+metrics.registry.register(metrics.Gauge(
+    "ironlady_conversations", "Conversations held in memory",
+    lambda: len(chatbot_service.conversations)
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_conversation_bytes", "Estimated bytes of in-memory conversation history",
+    lambda: chatbot_service.conversations.stats()["estimated_bytes"]
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_llm_in_flight", "LLM calls currently running",
+    lambda: chatbot_service.llm.stats()["in_flight"]
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_llm_waiting", "LLM calls queued for a concurrency slot",
+    lambda: chatbot_service.llm.stats()["waiting"]
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_admitted_llm_requests", "Requests holding or waiting for an LLM slot",
+    lambda: chatbot_service.admission.in_flight
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_websocket_sessions", "Open WebSocket chat sessions",
+    lambda: ChatSocketSession.open_sessions
+))
+metrics.registry.register(metrics.Gauge(
+    "ironlady_event_loop_lag_max_seconds", "Worst event loop lag seen since startup",
+    lambda: loop_monitor.max_lag
+))
 
 
 class ChatRequest(BaseModel):
@@ -41,31 +158,94 @@ class ChatResponse(BaseModel):
     message: str
     conversation_id: str
     suggestions: Optional[List[str]] = None
+    # Set when the LLM was saturated or failing and a cached or fallback answer was served
+    degraded: bool = False
+
+
+class BatchChatRequest(BaseModel):
+    messages: List[ChatRequest]
+    # Values above BATCH_MAX_PARALLEL are capped to it
+    max_parallel: Optional[int] = Field(None, ge=1)
 
 
 class QuickQuestionsResponse(BaseModel):
     questions: List[str]
 
 
+def check_rate_limit(request: Request, endpoint: str):
+    """Reject the request with 429 when the client is over its rate limit"""
+    allowed, retry_after = rate_limiter.allow(request.client.host if request.client else "unknown")
+    if not allowed:
+        metrics.RATE_LIMITED.inc(endpoint)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
 @app.get("/")
-async def root():
-    return {
-        "message": "Iron Lady Learning Assistant API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+async def root(request: Request):
+    return static_responses.respond("root", request)
 
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "lifecycle": lifecycle.stats(),
+        "knowledge_base_version": knowledge_base.version,
+        "warmup": answer_warmer.stats(),
+        "conversations": chatbot_service.conversations.stats(),
+        "answer_cache": chatbot_service.answer_cache.stats(),
+        "single_flight": chatbot_service.single_flight.stats(),
+        "batch": batch_runner.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "admission": chatbot_service.admission.stats(),
+        "router": chatbot_service.router.stats(),
+        "websockets": ChatSocketSession.stats(),
+        "llm": {**chatbot_service.llm.stats(), **chatbot_service.token_usage},
+        "prompt_cache": chatbot_service.prompt_cache.stats(),
+        "startup": startup.stats()
+    }
+
+
+@app.get("/api/health/live")
+async def liveness():
+    """
+    Liveness probe: the worker's event loop is responsive
+    """
+    return {"status": "alive", **lifecycle.stats()}
+
+
+@app.get("/api/health/ready")
+async def readiness():
+    """
+    Readiness probe: 200 only while serving; 503 while starting, warming or draining
+    """
+    return JSONResponse(
+        {"ready": lifecycle.ready, **lifecycle.stats()},
+        status_code=200 if lifecycle.ready else 503
+    )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: per-stage latency histograms, token and error counters
+    """
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Main chat endpoint - processes user messages and returns AI responses
     """
+    check_rate_limit(http_request, "chat")
     try:
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
@@ -82,39 +262,114 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Streaming chat endpoint - sends response tokens as Server-Sent Events
+    """
+    check_rate_limit(http_request, "stream")
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    async def event_stream():
+        async for event in chatbot_service.stream_message(
+            message=request.message,
+            conversation_id=request.conversation_id
+        ):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest, http_request: Request):
+    """
+    Batch chat endpoint - answers many messages concurrently and streams one
+    NDJSON line per message as it completes. Messages with the same
+    conversation_id are processed in order. A batch counts as one request
+    against the rate limit; its messages are throttled by BATCH_MAX_PARALLEL
+    and LLM admission control instead.
+    """
+    if len(request.messages) > batch_runner.max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {batch_runner.max_items} messages per batch"
+        )
+    check_rate_limit(http_request, "batch")
+    
+    async def result_lines():
+        async for result in batch_runner.run(
+            chatbot_service.process_message,
+            [item.model_dump() for item in request.messages],
+            request.max_parallel
+        ):
+            yield json.dumps(result) + "\n"
+    
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+
+@app.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, conversation_id: Optional[str] = None):
+    """
+    WebSocket chat channel - one connection per session, tokens and
+    suggestions are pushed as they are produced
+    """
+    await ChatSocketSession(
+        websocket, chatbot_service, conversation_id, rate_limiter=rate_limiter
+    ).run()
+
+
 @app.get("/api/quick-questions", response_model=QuickQuestionsResponse)
-async def get_quick_questions():
+async def get_quick_questions(request: Request):
     """
     Returns a list of quick question suggestions
     """
-    questions = [
-        "What programs do you offer?",
-        "How do I enroll in a course?",
-        "What are the prerequisites for leadership training?",
-        "Can you tell me about the course schedule?",
-        "What is the cost of your programs?",
-        "Do you offer any scholarships or financial aid?",
-        "How long are the programs?",
-        "What certifications will I receive?",
-    ]
-    return QuickQuestionsResponse(questions=questions)
+    return static_responses.respond("quick_questions", request)
 
 
 @app.get("/api/programs")
-async def get_programs():
+async def get_programs(request: Request):
     """
     Returns information about available programs
     """
+    return static_responses.respond("programs", request)
+
+
+def server_options() -> dict:
+    """uvicorn settings for production: all cores, uvloop/httptools, tuned keep-alive, graceful drain"""
+    shared_conversations = os.getenv("CONVERSATION_BACKEND", "memory").lower() != "memory"
+    # With the in-process store every worker has its own conversations, so only
+    # scale out by default when they are shared
+    default_workers = (os.cpu_count() or 1) if shared_conversations else 1
+    workers = int(os.getenv("WEB_CONCURRENCY", default_workers))
+    if workers > 1 and not shared_conversations:
+        print("⚠️  WARNING: conversations are per worker with CONVERSATION_BACKEND=memory; "
+              "use sqlite or sticky sessions for multi-turn chats")
+
     return {
-        "programs": knowledge_base.get_programs_info()
+        "workers": workers,
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        # Keep idle connections open longer than the load balancer does
+        "timeout_keep_alive": int(os.getenv("KEEP_ALIVE_SECONDS", 75)),
+        "timeout_graceful_shutdown": int(lifecycle.grace_seconds),
+        "backlog": int(os.getenv("SERVER_BACKLOG", 2048)),
+        "proxy_headers": True,
+        "access_log": os.getenv("ACCESS_LOG", "false").lower() == "true",
     }
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Iron Lady Learning Assistant API server")
+    parser.add_argument("--reload", action="store_true", help="development mode: one worker, auto-reload")
+    args = parser.parse_args()
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True
-    )
+
+    if args.reload:
+        uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=port, **server_options())
@@ -0,0 +1,102 @@
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Hashable, Tuple
+
+from services import metrics
+
+
+class LoadShedError(Exception):
+    """Raised when the LLM is saturated and a request should be answered without it"""
+
+
+class RateLimiter:
+    """
+    Per-client token buckets.
+
+    Each client holds up to `burst` tokens, refilled at `per_minute` tokens a
+    minute; a request spends one. Buckets are kept in LRU order and capped at
+    `max_clients`, so memory stays bounded no matter how many addresses show
+    up - an evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(self, per_minute: float = None, burst: int = None, max_clients: int = None):
+        self.per_minute = per_minute if per_minute is not None else float(os.getenv("RATE_LIMIT_PER_MINUTE", 30))
+        self.burst = burst or int(os.getenv("RATE_LIMIT_BURST", 10))
+        self.max_clients = max_clients or int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 10000))
+        self.enabled = self.per_minute > 0
+        self._rate = self.per_minute / 60
+        # client -> (tokens, last refill time)
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    def allow(self, client: Hashable) -> Tuple[bool, float]:
+        """Spend a token for client; returns (allowed, seconds until the next token)"""
+        if not self.enabled:
+            return True, 0.0
+
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self._rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0.0
+        self.limited += 1
+        return False, (1 - tokens) / self._rate
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "per_minute": self.per_minute,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "max_clients": self.max_clients,
+            "limited": self.limited,
+        }
+
+
+class AdmissionController:
+    """
+    Global cap on requests waiting for or holding an LLM slot.
+
+    The limit is the LLM concurrency cap plus a short queue. Past it, new work
+    is shed straight away (LoadShedError) so callers can serve a cached or
+    fallback answer instead of queueing behind calls that will not finish
+    before the client gives up.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int = None):
+        queue = max_queue if max_queue is not None else int(os.getenv("ADMISSION_MAX_QUEUE", max_concurrency))
+        self.max_in_flight = max_concurrency + queue
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+
+    @contextmanager
+    def admit(self):
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            metrics.LOAD_SHED.inc()
+            raise LoadShedError(f"{self.in_flight} LLM requests in flight (limit {self.max_in_flight})")
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
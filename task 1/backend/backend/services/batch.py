@@ -0,0 +1,77 @@
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+_DONE = object()
+
+
+class BatchRunner:
+    """
+    Runs many chat messages through the normal pipeline concurrently.
+
+    Messages sharing a conversation id run one after another in request order
+    (each turn needs the previous one's history); everything else fans out
+    under a parallelism limit. Results are yielded as they complete, tagged
+    with the index of the message they answer.
+    """
+
+    def __init__(self, max_parallel: int = None, max_items: int = None):
+        self.max_parallel = max_parallel or int(os.getenv("BATCH_MAX_PARALLEL", 8))
+        self.max_items = max_items or int(os.getenv("BATCH_MAX_ITEMS", 1000))
+        self.batches = 0
+        self.items = 0
+
+    async def run(
+        self,
+        process: Callable[[str, Optional[str]], Awaitable[Dict]],
+        items: List[Dict],
+        parallel: int = None
+    ) -> AsyncIterator[Dict]:
+        """Yield one result (or error) per item as soon as it is ready"""
+        self.batches += 1
+        semaphore = asyncio.Semaphore(min(parallel or self.max_parallel, self.max_parallel))
+        results: asyncio.Queue = asyncio.Queue()
+
+        groups: Dict[object, List[int]] = {}
+        for index, item in enumerate(items):
+            # Messages without a conversation id are independent new conversations
+            key = item.get("conversation_id") or ("new", index)
+            groups.setdefault(key, []).append(index)
+
+        async def run_group(indexes: List[int]):
+            for index in indexes:
+                item = items[index]
+                message = item["message"]
+                if not message.strip():
+                    await results.put({"index": index, "error": "Message cannot be empty"})
+                    continue
+                async with semaphore:
+                    try:
+                        response = await process(message, item.get("conversation_id"))
+                    except Exception as e:
+                        await results.put({"index": index, "error": str(e) or type(e).__name__})
+                        continue
+                self.items += 1
+                await results.put({"index": index, **response})
+
+        tasks = [asyncio.create_task(run_group(indexes)) for indexes in groups.values()]
+        finished = asyncio.gather(*tasks)
+        finished.add_done_callback(lambda _: results.put_nowait(_DONE))
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                yield result
+        finally:
+            # The client went away or the batch finished; stop any remaining work
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "max_parallel": self.max_parallel,
+            "max_items": self.max_items,
+        }
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from services import metrics
+from services.admission import RateLimiter
+
+# Frames a session may queue for the client before tokens are coalesced
+SEND_QUEUE_SIZE = 64
+
+
+class ChatSocketSession:
+    """
+    One WebSocket chat connection.
+
+    The conversation id is fixed for the life of the connection, so follow-up
+    messages skip the per-request HTTP overhead. History is read from the
+    store for every turn rather than held by the session, so rolling
+    summaries written in the background (and writes from other workers) are
+    always picked up. Client messages are answered one at a time in order;
+    tokens are pushed as they are produced and, when the client reads slower
+    than the model writes, merged into fewer larger frames instead of
+    stalling the upstream stream. A heartbeat ping keeps mobile and proxy
+    connections alive and sessions idle for too long are closed.
+
+    Client frames:  {"type": "message", "message": "...", "id": optional}, {"type": "ping"}
+    Server frames:  ready, token, done, error, ping, pong (all JSON with a "type")
+    """
+
+    open_sessions = 0
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        chatbot_service,
+        conversation_id: Optional[str] = None,
+        heartbeat_seconds: float = None,
+        idle_timeout: float = None,
+        max_pending: int = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        self.websocket = websocket
+        self.chatbot_service = chatbot_service
+        self.conversation_id = conversation_id or str(uuid.uuid4())
+        self.heartbeat_seconds = heartbeat_seconds or float(os.getenv("WS_HEARTBEAT_SECONDS", 20))
+        self.idle_timeout = idle_timeout or float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", 300))
+        self.max_pending = max_pending or int(os.getenv("WS_MAX_PENDING_MESSAGES", 8))
+        # Messages share the HTTP endpoints' per-client budget
+        self.rate_limiter = rate_limiter
+        self.client = websocket.client.host if websocket.client else "unknown"
+
+        self.last_activity = time.monotonic()
+        self._answering = False
+        self._inbound: asyncio.Queue = asyncio.Queue(self.max_pending)
+        self._outbound: asyncio.Queue = asyncio.Queue(SEND_QUEUE_SIZE)
+
+    async def run(self):
+        await self.websocket.accept()
+        ChatSocketSession.open_sessions += 1
+        await self._outbound.put({"type": "ready", "conversation_id": self.conversation_id})
+
+        tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._answer()),
+            asyncio.create_task(self._send()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        try:
+            # Any task ending (disconnect, idle timeout, send failure) ends the session
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            ChatSocketSession.open_sessions -= 1
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+
+    async def _receive(self):
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                self.last_activity = time.monotonic()
+                try:
+                    frame = json.loads(text)
+                except ValueError:
+                    await self._outbound.put({"type": "error", "detail": "Frames must be JSON"})
+                    continue
+
+                kind = frame.get("type")
+                if kind == "ping":
+                    await self._outbound.put({"type": "pong"})
+                elif kind == "message":
+                    message = str(frame.get("message", ""))
+                    if not message.strip():
+                        await self._outbound.put({
+                            "type": "error", "id": frame.get("id"), "detail": "Message cannot be empty"
+                        })
+                        continue
+                    if self._inbound.full():
+                        await self._outbound.put({
+                            "type": "error", "id": frame.get("id"), "detail": "Too many pending messages"
+                        })
+                        continue
+
+                    # Charged only for messages that will actually be answered
+                    allowed, retry_after = (
+                        self.rate_limiter.allow(self.client) if self.rate_limiter else (True, 0.0)
+                    )
+                    if not allowed:
+                        metrics.RATE_LIMITED.inc("websocket")
+                        await self._outbound.put({
+                            "type": "error", "id": frame.get("id"), "detail": "Too many requests",
+                            "retry_after": round(retry_after, 1)
+                        })
+                    else:
+                        self._inbound.put_nowait((frame.get("id"), message))
+        except WebSocketDisconnect:
+            return
+
+    async def _answer(self):
+        while True:
+            message_id, message = await self._inbound.get()
+            self._answering = True
+            try:
+                async for event in self.chatbot_service.stream_message(message, self.conversation_id):
+                    if event["event"] == "token":
+                        await self._outbound.put({"type": "token", "id": message_id, **event["data"]})
+                    elif event["event"] == "done":
+                        await self._outbound.put({"type": "done", "id": message_id, **event["data"]})
+            except Exception as e:
+                print(f"Error in chat socket: {str(e)}")
+                await self._outbound.put({"type": "error", "id": message_id, "detail": str(e)})
+            finally:
+                self._answering = False
+
+    async def _send(self):
+        held = None
+        while True:
+            frame = held or await self._outbound.get()
+            held = None
+            # Backpressure: merge tokens that queued up while the client was slow to read
+            while frame["type"] == "token" and not self._outbound.empty():
+                following = self._outbound.get_nowait()
+                if following["type"] != "token" or following["id"] != frame["id"]:
+                    held = following
+                    break
+                frame["text"] += following["text"]
+            await self.websocket.send_text(json.dumps(frame))
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            idle = time.monotonic() - self.last_activity > self.idle_timeout
+            if idle and not self._answering and self._inbound.empty():
+                await self.websocket.close(code=1000, reason="Idle timeout")
+                return
+            await self._outbound.put({"type": "ping"})
+
+    @classmethod
+    def stats(cls) -> Dict:
+        return {"open": cls.open_sessions}
@@ -1,20 +1,38 @@
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import time
 import uuid
 import os
-from litellm import completion
+
+from services import metrics
+from services.admission import AdmissionController, LoadShedError
+from services.conversation_backend import create_conversation_backend
+from services.conversation_store import ConversationStore
+from services.history import HistoryWindow, SUMMARY_ROLE, estimate_tokens
+from services.intent import IntentEngine, PROGRAMS, ENROLLMENT, PRICING, SCHEDULE
+from services.llm_client import LLMClient
+from services.model_router import ModelRouter
+from services.prompt_cache import PromptCache
+from services.response_cache import AnswerCache, normalize_message
+from services.single_flight import SingleFlight
 
 
 class ChatbotService:
     def __init__(self, knowledge_base):
         self.knowledge_base = knowledge_base
-        self.conversations: Dict[str, list] = {}
+        self.conversations = ConversationStore(backend=create_conversation_backend())
         
         # Initialize configuration
         self.credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         self.agent_model = os.getenv("AGENT_MODEL", "gemini-2.5-pro")
+        self.api_base = os.getenv("LLM_API_BASE")
         
         # Set credentials in environment for LiteLLM
-        if self.credentials_path:
+        if self.api_base:
+            print(f"🔌 OpenAI-compatible endpoint: {self.api_base}")
+            print(f"🤖 Model: openai/{self.agent_model}")
+            self.client_available = True
+        elif self.credentials_path:
             if not os.path.isabs(self.credentials_path):
                 self.credentials_path = os.path.abspath(self.credentials_path)
             
@@ -32,12 +50,87 @@ class ChatbotService:
             print("⚠️  WARNING: GOOGLE_APPLICATION_CREDENTIALS not found. Using fallback responses.")
             self.client_available = False
         
+        provider = "openai" if self.api_base else "vertex_ai"
+        self.hedge_model = os.getenv("HEDGE_MODEL")
+        # OpenAI-compatible endpoints usually serve a single model
+        self.fast_model = os.getenv("FAST_MODEL", self.agent_model if self.api_base else "gemini-2.5-flash")
+        self.llm = LLMClient(
+            model=f"{provider}/{self.agent_model}",
+            api_base=self.api_base,
+            api_key=os.getenv("LLM_API_KEY", "none") if self.api_base else None,
+            hedge_model=f"{provider}/{self.hedge_model}" if self.hedge_model else None
+        )
+        # Requests beyond the LLM cap plus a short queue get a degraded answer right away
+        self.admission = AdmissionController(self.llm.max_concurrency)
+        if self.llm.transport is not None and self.llm.transport.mode == "replay":
+            print(f"📼 Replaying LLM responses from {self.llm.transport.path}")
+            self.client_available = True
+        # Context caching is a Vertex feature; recordings always carry the full
+        # prompt so their keys do not depend on whether a cache was live
+        self.prompt_cache = PromptCache(
+            self.agent_model,
+            enabled=False if self.api_base or self.llm.transport is not None else None
+        )
+        self.answer_cache = AnswerCache()
+        self.single_flight = SingleFlight()
+        # Words the knowledge base uses are never treated as typos of a keyword
+        self.intent_engine = IntentEngine(knowledge_base.snapshot.vocabulary)
+        # Greetings and short factual questions go to the fast model with a smaller budget
+        self.router = ModelRouter(
+            self.llm.model,
+            f"{provider}/{self.fast_model}" if self.fast_model else None,
+            self.intent_engine
+        )
+        self.history = HistoryWindow()
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+        # Background import of the LLM provider stack, started with the service
+        self.provider_warmup: Optional[asyncio.Task] = None
+        self.token_usage = {"requests": 0, "estimated_prompt_tokens": 0, "last_prompt_tokens": 0}
         self.system_prompt = self._build_system_prompt()
     
+    @property
+    def knowledge_index(self):
+        """Retrieval index of the current knowledge base snapshot"""
+        return self.knowledge_base.snapshot.index
+    
+    @property
+    def faq_matcher(self):
+        """FAQ matcher of the current knowledge base snapshot"""
+        return self.knowledge_base.snapshot.faq_matcher
+    
+    def _on_knowledge_base_change(self, snapshot):
+        # Answers are keyed by version, so old ones can never match again
+        self.answer_cache.invalidate()
+        self.intent_engine.known_words = snapshot.vocabulary
+    
+    async def start(self):
+        """Start background tasks on the running event loop"""
+        self.knowledge_base.add_listener(self._on_knowledge_base_change)
+        self.knowledge_base.start()
+        self.conversations.start()
+        if self.client_available:
+            self.provider_warmup = asyncio.create_task(self.llm.warm_up())
+            self.prompt_cache.start(lambda: self.system_prompt)
+    
+    async def drain(self, timeout: float):
+        """Let in-flight LLM work (replies, summaries) finish before shutting down"""
+        deadline = time.monotonic() + timeout
+        summaries = [task for task in self._summary_tasks.values() if not task.done()]
+        if summaries:
+            await asyncio.wait(summaries, timeout=timeout)
+        while self.llm.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    
+    async def stop(self):
+        """Stop background tasks and flush conversation state"""
+        if self.provider_warmup is not None and not self.provider_warmup.done():
+            self.provider_warmup.cancel()
+        await self.knowledge_base.stop()
+        await self.prompt_cache.stop()
+        await self.conversations.stop()
+    
     def _build_system_prompt(self) -> str:
-        """Build the system prompt with knowledge base context"""
-        kb_context = self.knowledge_base.get_context()
-        
+        """Build the constant core system prompt; knowledge base excerpts are added per request"""
         return f"""You are an AI assistant for Iron Lady - a bold, empowering organization with the mission of ELEVATING A MILLION WOMEN TO THE TOP through Business War Tactics and unapologetic winning mindsets.
 
 BRAND VOICE & PERSONALITY:
@@ -56,7 +149,7 @@ YOUR ROLE:
 5. Challenge their limiting beliefs and empower bold action
 
 KNOWLEDGE BASE:
-{kb_context}
+The most relevant knowledge base excerpts for each question are provided at the end of this prompt.
 
 KEY MESSAGING POINTS:
 - Iron Lady is for women who refuse to "suffer", "just adjust", or "stop dreaming"
@@ -91,62 +184,340 @@ Respond in a powerful, inspiring tone that makes women feel ready to conquer the
         conversation_id: Optional[str] = None
     ) -> Dict:
         """Process user message and generate response"""
-        
+        metrics.IN_FLIGHT_REQUESTS.inc()
+        started = time.perf_counter()
+        try:
+            return await self._process_message(message, conversation_id)
+        finally:
+            metrics.IN_FLIGHT_REQUESTS.dec()
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, "chat")
+    
+    async def _process_message(self, message: str, conversation_id: Optional[str]) -> Dict:
         # Create or retrieve conversation
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
             self.conversations[conversation_id] = []
         
-        conversation = self.conversations.get(conversation_id, [])
+        conversation = await self.conversations.get(conversation_id, [])
         
         # Add user message to conversation history
         conversation.append({"role": "user", "content": message})
         
-        # Generate response
-        if self.client_available:
-            try:
-                response_text = await self._generate_gemini_response(conversation)
-            except Exception as e:
-                print(f"Gemini API error: {str(e)}")
-                response_text = self._generate_fallback_response(message)
+        # Classify once; the fallback text and suggestions both reuse it
+        intent = self.intent_engine.classify(message)
+        
+        # Answer canonical FAQs locally on the first turn, otherwise generate a
+        # response; later turns may depend on context the FAQ answer ignores
+        first_turn = len(conversation) == 1
+        faq = self._match_faq(message) if first_turn else None
+        degraded = False
+        if faq is not None:
+            metrics.ANSWERS.inc("faq")
+            response_text = faq.answer
         else:
-            response_text = self._generate_fallback_response(message)
+            response_text, degraded = await self._generate_response(message, conversation, intent)
         
         # Add assistant response to conversation
         conversation.append({"role": "assistant", "content": response_text})
         
-        # Store updated conversation (keep last 10 messages for context)
-        self.conversations[conversation_id] = conversation[-10:]
+        # Store updated conversation; older turns are summarized in the background
+        self._store_conversation(conversation_id, conversation)
         
         return {
             "message": response_text,
             "conversation_id": conversation_id,
-            "suggestions": self._generate_suggestions(message)
+            "suggestions": faq.related if faq is not None else self._generate_suggestions(intent),
+            "degraded": degraded
         }
     
-    async def _generate_gemini_response(self, conversation: list) -> str:
-        """Generate response using Google Gemini via LiteLLM"""
-        # Prepare messages with system prompt
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ] + conversation
-        
-        # Call Gemini using LiteLLM
-        response = completion(
-            model=f"vertex_ai/{self.agent_model}",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=500
+    async def stream_message(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream response tokens, committing history only once the reply is complete"""
+        metrics.IN_FLIGHT_REQUESTS.inc()
+        started = time.perf_counter()
+        try:
+            async for event in self._stream_message(message, conversation_id):
+                yield event
+        finally:
+            metrics.IN_FLIGHT_REQUESTS.dec()
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, "stream")
+    
+    async def _stream_message(
+        self,
+        message: str,
+        conversation_id: Optional[str]
+    ) -> AsyncIterator[Dict]:
+        if not conversation_id:
+            conversation_id = str(uuid.uuid4())
+        
+        conversation = await self.conversations.get(conversation_id, []) + [
+            {"role": "user", "content": message}
+        ]
+        
+        first_turn = len(conversation) == 1
+        intent = self.intent_engine.classify(message)
+        faq = self._match_faq(message) if first_turn else None
+        cached = self._cached_answer(message) if first_turn and faq is None else None
+        
+        chunks = []
+        degraded = False
+        if faq is not None:
+            metrics.ANSWERS.inc("faq")
+            chunks.append(faq.answer)
+            yield {"event": "token", "data": {"text": faq.answer}}
+        elif cached is not None:
+            metrics.ANSWERS.inc("cache")
+            chunks.append(cached)
+            yield {"event": "token", "data": {"text": cached}}
+        elif self.client_available:
+            if first_turn:
+                # Identical first-turn questions already streaming share one upstream call
+                key = (normalize_message(message), self.knowledge_base.version)
+                tokens = self.single_flight.stream(
+                    key, lambda: self._stream_gemini_response(conversation)
+                )
+            else:
+                tokens = self._stream_gemini_response(conversation)
+            try:
+                async for token in tokens:
+                    chunks.append(token)
+                    yield {"event": "token", "data": {"text": token}}
+                if chunks:
+                    metrics.ANSWERS.inc("llm")
+                if first_turn and chunks:
+                    self._cache_answer(message, "".join(chunks))
+            except LoadShedError:
+                degraded = True
+            except Exception as e:
+                print(f"Gemini streaming error: {str(e)}")
+                degraded = True
+        
+        # Nothing was streamed, so send the fallback answer as a single chunk
+        if not chunks:
+            fallback = self._degraded_response(message, intent)
+            chunks.append(fallback)
+            yield {"event": "token", "data": {"text": fallback}}
+        
+        conversation.append({"role": "assistant", "content": "".join(chunks)})
+        self._store_conversation(conversation_id, conversation)
+        
+        yield {
+            "event": "done",
+            "data": {
+                "conversation_id": conversation_id,
+                "suggestions": faq.related if faq is not None else self._generate_suggestions(intent),
+                "degraded": degraded
+            }
+        }
+    
+    async def _generate_response(self, message: str, conversation: list, intent: str) -> Tuple[str, bool]:
+        """
+        Answer from the cache, Gemini or the fallback responses, in that order.
+        The flag is set when Gemini was needed but shed or failed.
+        """
+        # Only first-turn questions are context free and safe to share
+        first_turn = len(conversation) == 1
+        if first_turn:
+            cached = self._cached_answer(message)
+            if cached is not None:
+                metrics.ANSWERS.inc("cache")
+                return cached, False
+        
+        if not self.client_available:
+            return self._generate_fallback_response(intent), False
+        
+        try:
+            if first_turn:
+                # Identical first-turn questions already in flight share one upstream call
+                key = (normalize_message(message), self.knowledge_base.version)
+                response_text = await self.single_flight.do(
+                    key, lambda: self._generate_gemini_response(conversation)
+                )
+            else:
+                response_text = await self._generate_gemini_response(conversation)
+        except LoadShedError:
+            return self._degraded_response(message, intent), True
+        except Exception as e:
+            print(f"Gemini API error: {str(e) or type(e).__name__}")
+            return self._degraded_response(message, intent), True
+        
+        metrics.ANSWERS.inc("llm")
+        if first_turn:
+            self._cache_answer(message, response_text)
+        return response_text, False
+    
+    def _degraded_response(self, message: str, intent: str) -> str:
+        """Answer without the LLM: a cached answer to a similar question, else the fallback"""
+        cached = self._cached_answer(message)
+        if cached is not None:
+            metrics.ANSWERS.inc("cache")
+            return cached
+        return self._generate_fallback_response(intent)
+    
+    def _match_faq(self, message: str):
+        with metrics.KNOWLEDGE_LOOKUP_SECONDS.time("faq"):
+            return self.faq_matcher.match(message)
+    
+    async def warm_answer(self, message: str):
+        """Generate and cache a first-turn answer ahead of time"""
+        if self.faq_matcher.match(message) is not None:
+            return
+        
+        conversation = [{"role": "user", "content": message}]
+        key = (normalize_message(message), self.knowledge_base.version)
+        response_text = await self.single_flight.do(
+            key, lambda: self._generate_gemini_response(conversation)
         )
+        self._cache_answer(message, response_text)
+    
+    def _store_conversation(self, conversation_id: str, conversation: list):
+        """Save history and schedule a rolling summary once it outgrows the budget"""
+        self.conversations[conversation_id] = self.history.trim(conversation)
         
-        return response.choices[0].message.content
+        if (
+            self.client_available
+            and conversation_id not in self._summary_tasks
+            and self.history.needs_summary(conversation)
+        ):
+            task = asyncio.create_task(self._summarize(conversation_id))
+            self._summary_tasks[conversation_id] = task
+            task.add_done_callback(lambda _: self._summary_tasks.pop(conversation_id, None))
     
-    def _generate_fallback_response(self, message: str) -> str:
-        """Generate fallback response when OpenAI is not available"""
-        message_lower = message.lower()
+    async def _summarize(self, conversation_id: str):
+        """Fold older turns into the rolling summary without blocking any reply"""
+        conversation = await self.conversations.get(conversation_id)
+        if conversation is None:
+            return
+        
+        older, messages = self.history.summary_request(conversation)
+        try:
+            summary = await self.llm.complete(messages, temperature=0.2, max_tokens=250)
+        except Exception as e:
+            print(f"Summary error: {str(e)}")
+            return
+        
+        # Only apply if the summarized turns are still at the front of the history
+        current = await self.conversations.get(conversation_id)
+        if current is None:
+            return
+        _, current_messages = self.history.split(current)
+        if current_messages[:len(older)] != older:
+            return
+        
+        self.conversations[conversation_id] = [
+            {"role": SUMMARY_ROLE, "content": summary}
+        ] + current_messages[len(older):]
+    
+    def _cached_answer(self, message: str) -> Optional[str]:
+        return self.answer_cache.get(message, self.knowledge_base.version)
+    
+    def _cache_answer(self, message: str, response_text: str):
+        self.answer_cache.put(message, self.knowledge_base.version, response_text)
+    
+    def _build_messages(self, conversation: list, use_cache: bool = True) -> tuple:
+        """
+        Prepare messages with the core system prompt, retrieved knowledge and a
+        token-budgeted history, plus extra completion arguments.
+        
+        When the core prompt lives in a provider-side cache it is referenced by
+        handle instead of resent, and the per-request context travels with the
+        latest user message (cached content cannot be combined with a system
+        instruction). The cache belongs to the primary model, so requests
+        routed elsewhere pass use_cache=False.
+        """
+        summary, recent, history_tokens = self.history.window(conversation)
         
-        # Simple keyword-based responses
-        if any(word in message_lower for word in ["program", "course", "offer", "available"]):
+        # Search with the last two user turns so short follow-ups keep their topic
+        user_turns = [m["content"] for m in recent if m["role"] == "user"][-2:]
+        with metrics.KNOWLEDGE_LOOKUP_SECONDS.time("retrieval"):
+            chunks = self.knowledge_index.search(" ".join(user_turns))
+        
+        context = ""
+        if chunks:
+            context += "\n\nRELEVANT KNOWLEDGE:\n" + self.knowledge_index.format_context(chunks)
+        if summary:
+            context += "\n\nEARLIER IN THIS CONVERSATION:\n" + summary
+        
+        cache_kwargs = self.prompt_cache.request_kwargs() if use_cache else {}
+        if cache_kwargs:
+            latest = recent[-1]
+            messages = recent[:-1] + [{
+                "role": latest["role"],
+                "content": f"{context.strip()}\n\nUSER MESSAGE:\n{latest['content']}" if context else latest["content"]
+            }]
+            prompt_tokens = estimate_tokens(context) + history_tokens
+            if self.llm.hedge_model:
+                # The secondary model cannot use the primary's cache, so it gets the full prompt
+                cache_kwargs["hedge_messages"] = [
+                    {"role": "system", "content": self.system_prompt + context}
+                ] + recent
+        else:
+            system_prompt = self.system_prompt + context
+            messages = [{"role": "system", "content": system_prompt}] + recent
+            prompt_tokens = estimate_tokens(system_prompt) + history_tokens
+        
+        self.token_usage["requests"] += 1
+        self.token_usage["estimated_prompt_tokens"] += prompt_tokens
+        self.token_usage["last_prompt_tokens"] = prompt_tokens
+        
+        return messages, cache_kwargs
+    
+    async def _generate_gemini_response(self, conversation: list) -> str:
+        """Generate response using Google Gemini via LiteLLM"""
+        # Admitted first, so shed requests skip retrieval and are not counted as routed
+        with self.admission.admit():
+            route = self.router.route(conversation)
+            messages, extra = self._build_messages(conversation, use_cache=route.model == self.llm.model)
+            
+            # Call Gemini using LiteLLM without blocking the event loop
+            try:
+                return await self.llm.complete(
+                    messages,
+                    temperature=route.temperature,
+                    max_tokens=route.max_tokens,
+                    model=route.model,
+                    **extra
+                )
+            except Exception as e:
+                self._on_cached_call_failed(extra, e)
+                raise
+    
+    async def _stream_gemini_response(self, conversation: list) -> AsyncIterator[str]:
+        """Stream response tokens from Google Gemini via LiteLLM"""
+        with self.admission.admit():
+            route = self.router.route(conversation)
+            messages, extra = self._build_messages(conversation, use_cache=route.model == self.llm.model)
+            
+            try:
+                async for token in self.llm.stream(
+                    messages,
+                    temperature=route.temperature,
+                    max_tokens=route.max_tokens,
+                    model=route.model,
+                    **extra
+                ):
+                    yield token
+            except Exception as e:
+                self._on_cached_call_failed(extra, e)
+                raise
+    
+    def _on_cached_call_failed(self, extra: Dict, error: Exception):
+        """Drop and immediately recreate the cache handle if the provider reported it missing or invalid"""
+        if extra.get("cached_content"):
+            self.prompt_cache.reject(extra["cached_content"], error)
+    
+    def _generate_fallback_response(self, intent: str) -> str:
+        """Generate fallback response for a classified intent when Gemini is not available"""
+        metrics.FALLBACKS.inc()
+        metrics.ANSWERS.inc("fallback")
+        with metrics.FALLBACK_SECONDS.time():
+            return self._fallback_text(intent)
+    
+    def _fallback_text(self, intent: str) -> str:
+        if intent == PROGRAMS:
             return """**Our Programs:**
 
 Iron Lady offers comprehensive leadership and professional development programs:
@@ -158,7 +529,7 @@ Iron Lady offers comprehensive leadership and professional development programs:
 
 Would you like detailed information about any specific program?"""
         
-        elif any(word in message_lower for word in ["enroll", "apply", "join", "sign up"]):
+        elif intent == ENROLLMENT:
             return """**Enrollment Process:**
 
 Getting started is easy:
@@ -171,7 +542,7 @@ Getting started is easy:
 
 The entire process typically takes 1-2 weeks. Would you like help choosing the right program for you?"""
         
-        elif any(word in message_lower for word in ["cost", "price", "fee", "tuition", "payment"]):
+        elif intent == PRICING:
             return """**Program Pricing:**
 
 Our programs are competitively priced to make leadership development accessible:
@@ -188,7 +559,7 @@ Our programs are competitively priced to make leadership development accessible:
 
 Would you like information about our scholarship program?"""
         
-        elif any(word in message_lower for word in ["schedule", "duration", "time", "when"]):
+        elif intent == SCHEDULE:
             return """**Program Schedules:**
 
 Our programs offer flexible scheduling:
@@ -212,17 +583,15 @@ I can assist you with:
 
 What would you like to know more about?"""
     
-    def _generate_suggestions(self, message: str) -> list:
-        """Generate follow-up question suggestions based on user message"""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["program", "course"]):
+    def _generate_suggestions(self, intent: str) -> list:
+        """Generate follow-up question suggestions based on the message intent"""
+        if intent == PROGRAMS:
             return [
                 "What are the prerequisites?",
                 "How long is the program?",
                 "What's the cost?",
             ]
-        elif any(word in message_lower for word in ["enroll", "apply"]):
+        elif intent == ENROLLMENT:
             return [
                 "What documents do I need?",
                 "When does the next cohort start?",
@@ -0,0 +1,141 @@
+import os
+import time
+from collections import deque
+from typing import Dict
+
+from services import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing"""
+
+
+class CircuitBreaker:
+    """
+    Error- and latency-rate circuit breaker for one upstream model.
+
+    Outcomes of the calls in a sliding time window are tracked; once enough
+    calls have been seen and the share of failures or of slow calls crosses its
+    threshold the circuit opens and calls are refused immediately, so callers
+    fall back in microseconds instead of waiting for the provider to time out.
+    After a cool-down the circuit is half-open: a few probe calls go through,
+    and their outcome closes the circuit again or re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = None,
+        min_calls: int = None,
+        error_rate: float = None,
+        slow_seconds: float = None,
+        slow_rate: float = None,
+        open_seconds: float = None,
+        probes: int = None
+    ):
+        self.name = name
+        self.window_seconds = window_seconds or float(os.getenv("BREAKER_WINDOW_SECONDS", 30))
+        self.min_calls = min_calls or int(os.getenv("BREAKER_MIN_CALLS", 10))
+        self.error_rate = error_rate or float(os.getenv("BREAKER_ERROR_RATE", 0.5))
+        self.slow_seconds = slow_seconds or float(os.getenv("BREAKER_SLOW_SECONDS", 10))
+        self.slow_rate = slow_rate or float(os.getenv("BREAKER_SLOW_RATE", 0.8))
+        self.open_seconds = open_seconds or float(os.getenv("BREAKER_OPEN_SECONDS", 15))
+        self.probes = probes or int(os.getenv("BREAKER_HALF_OPEN_PROBES", 1))
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        # (finished_at, failed, slow) per call in the window
+        self._outcomes: deque = deque()
+        self._failures = 0
+        self._slow = 0
+        self._probing = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for {self.name} is open")
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probing >= self.probes:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for {self.name} is half-open, probe in flight")
+            self._probing += 1
+
+    def available(self) -> bool:
+        """Whether before_call would admit a call now, without changing any state"""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        if self.state == HALF_OPEN:
+            return self._probing < self.probes
+        return True
+
+    def record(self, ok: bool, latency: float):
+        """Report the outcome of an admitted call"""
+        slow = latency >= self.slow_seconds
+
+        if self.state == HALF_OPEN:
+            self._probing = max(self._probing - 1, 0)
+            if ok and not slow:
+                self._transition(CLOSED)
+            else:
+                self._trip()
+            return
+
+        now = time.monotonic()
+        self._outcomes.append((now, not ok, slow))
+        self._failures += not ok
+        self._slow += slow
+        self._expire(now)
+
+        calls = len(self._outcomes)
+        if self.state == CLOSED and calls >= self.min_calls and (
+            self._failures / calls >= self.error_rate or self._slow / calls >= self.slow_rate
+        ):
+            self._trip()
+
+    def cancel(self):
+        """Release an admitted call that was abandoned without an outcome"""
+        if self.state == HALF_OPEN:
+            self._probing = max(self._probing - 1, 0)
+
+    def _expire(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            _, failed, slow = self._outcomes.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _trip(self):
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        self._probing = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._failures = self._slow = 0
+        metrics.CIRCUIT_TRANSITIONS.inc(self.name, state)
+        print(f"⚡ Circuit for {self.name} is now {state}")
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "calls_in_window": len(self._outcomes),
+            "failures_in_window": self._failures,
+            "slow_in_window": self._slow,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,132 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class ConversationBackend(ABC):
+    """
+    Shared persistence behind ConversationStore, so conversations survive
+    restarts and can be read by every worker process
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def load(self, conversation_id: str, not_before: float) -> Optional[List[Dict]]:
+        """Load a conversation last written at or after the given wall time"""
+
+    @abstractmethod
+    def save_many(self, conversations: Dict[str, List[Dict]]):
+        """Write a batch of conversations in a single transaction"""
+
+    @abstractmethod
+    def delete(self, conversation_id: str):
+        """Remove one conversation"""
+
+    @abstractmethod
+    def purge_older_than(self, cutoff: float) -> int:
+        """Drop conversations not written since the given wall time"""
+
+    def close(self):
+        pass
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """
+    SQLite conversation backend in WAL mode - needs no outside services and
+    lets several worker processes on one machine share conversations.
+
+    Methods block and are called from worker threads. Reads use their own
+    connection, so in WAL mode they never wait behind a batch write.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                messages TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations(updated_at)"
+        )
+        self._read_lock = threading.Lock()
+        self._read_conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def load(self, conversation_id: str, not_before: float) -> Optional[List[Dict]]:
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT messages FROM conversations WHERE id = ? AND updated_at >= ?",
+                (conversation_id, not_before)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, conversations: Dict[str, List[Dict]]):
+        if not conversations:
+            return
+
+        now = time.time()
+        rows = [
+            (conversation_id, json.dumps(messages, separators=(",", ":")), now)
+            for conversation_id, messages in conversations.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    """INSERT INTO conversations (id, messages, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        messages = excluded.messages,
+                        updated_at = excluded.updated_at""",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, conversation_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def purge_older_than(self, cutoff: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM conversations WHERE updated_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+
+
+def create_conversation_backend() -> Optional[ConversationBackend]:
+    """Build the backend selected by CONVERSATION_BACKEND (memory or sqlite)"""
+    backend = os.getenv("CONVERSATION_BACKEND", "memory").lower()
+
+    if backend == "memory":
+        return None
+    if backend == "sqlite":
+        return SQLiteConversationBackend(os.getenv("CONVERSATION_DB_PATH", "conversations.db"))
+
+    raise ValueError(f"Unknown CONVERSATION_BACKEND: {backend}")
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import os
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from services.conversation_backend import ConversationBackend
+from services.history import SUMMARY_ROLE
+
+# Rough per-message overhead (dict, keys, string headers) used for byte estimates
+MESSAGE_OVERHEAD_BYTES = 240
+# Per-message overhead once compacted: a tuple slot, a role byte and a string header
+COMPACT_MESSAGE_OVERHEAD_BYTES = 60
+# Fixed cost of a CompactHistory (object, roles bytes, contents tuple)
+COMPACT_OVERHEAD_BYTES = 150
+
+# Interned role codes; the position in this tuple is the stored byte
+ROLES = ("user", "assistant", "system", SUMMARY_ROLE)
+_ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+class CompactHistory:
+    """
+    Idle conversation packed without per-message dicts.
+
+    Roles are one byte each and contents a tuple of strings, or, when
+    compressed, one zlib blob of all contents. Expanded back to message dicts
+    as soon as the conversation is used again.
+    """
+
+    __slots__ = ("roles", "contents", "packed")
+
+    def __init__(self, roles: bytes, contents: Tuple[str, ...] = (), packed: bytes = None):
+        self.roles = roles
+        self.contents = contents
+        self.packed = packed
+
+    @classmethod
+    def pack(cls, messages: List[Dict], compress: bool = False) -> Optional["CompactHistory"]:
+        """Compact a message list; None if it holds anything besides role and content"""
+        codes = []
+        for message in messages:
+            code = _ROLE_CODES.get(message["role"])
+            if code is None or len(message) != 2:
+                return None
+            codes.append(code)
+
+        contents = tuple(message["content"] for message in messages)
+        if compress:
+            return cls(bytes(codes), packed=zlib.compress(
+                json.dumps(contents, separators=(",", ":")).encode()
+            ))
+        return cls(bytes(codes), contents)
+
+    def expand(self) -> List[Dict]:
+        contents = json.loads(zlib.decompress(self.packed)) if self.packed is not None else self.contents
+        return [
+            {"role": ROLES[code], "content": content}
+            for code, content in zip(self.roles, contents)
+        ]
+
+    def size(self) -> int:
+        """Byte estimate, comparable to ConversationStore.estimate_size"""
+        if self.packed is not None:
+            return COMPACT_OVERHEAD_BYTES + len(self.roles) + len(self.packed)
+        return COMPACT_OVERHEAD_BYTES + sum(
+            len(content) + COMPACT_MESSAGE_OVERHEAD_BYTES for content in self.contents
+        )
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+
+class _Entry:
+    __slots__ = ("messages", "last_access", "loaded_at", "size")
+
+    def __init__(self, messages: Union[List[Dict], CompactHistory], now: float, size: int):
+        self.messages = messages
+        self.last_access = now
+        self.loaded_at = now
+        self.size = size
+
+
+class ConversationStore:
+    """
+    Bounded in-memory conversation store with idle TTL and LRU eviction.
+
+    Maps conversation_id -> message list; reads are awaited (get, pop) because
+    they may go to the backend, writes are plain item assignment. Entries are kept in
+    least-recently-used order, so both TTL sweeps and size eviction only ever
+    touch the oldest end of the store.
+
+    With a shared backend every read goes to the backend in a worker thread
+    (unless this worker still has unflushed writes for the conversation), so
+    a turn answered by another worker is never overwritten with a stale
+    copy; writes are queued and flushed in batches every flush_interval
+    seconds. A non-zero cache_seconds trusts cached entries for that long,
+    which is only safe when each conversation sticks to one worker.
+
+    Conversations idle for compact_seconds are packed into a CompactHistory
+    (optionally zlib-compressed) by the background sweep, so the many idle
+    sessions of a busy worker do not each hold a dict per message; they are
+    expanded again on their next access.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = None,
+        max_entries: int = None,
+        max_bytes: int = None,
+        sweep_interval: float = None,
+        backend: Optional[ConversationBackend] = None,
+        flush_interval: float = None,
+        cache_seconds: float = None,
+        compact_seconds: float = None,
+        compress: bool = None
+    ):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("CONVERSATION_TTL_SECONDS", 3600))
+        self.max_entries = max_entries or int(os.getenv("CONVERSATION_MAX_ENTRIES", 10000))
+        self.max_bytes = max_bytes or int(os.getenv("CONVERSATION_MAX_BYTES", 64 * 1024 * 1024))
+        self.sweep_interval = sweep_interval or float(os.getenv("CONVERSATION_SWEEP_SECONDS", 60))
+        self.backend = backend
+        self.flush_interval = flush_interval or float(os.getenv("CONVERSATION_FLUSH_SECONDS", 0.25))
+        self.cache_seconds = cache_seconds if cache_seconds is not None else float(
+            os.getenv("CONVERSATION_CACHE_SECONDS", 0)
+        )
+        self.compact_seconds = compact_seconds if compact_seconds is not None else float(
+            os.getenv("CONVERSATION_COMPACT_SECONDS", 60)
+        )
+        if compress is None:
+            compress = os.getenv("CONVERSATION_COMPRESS", "false").lower() == "true"
+        self.compress = compress
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._pending: Dict[str, List[Dict]] = {}
+        self._flushing: Dict[str, List[Dict]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.evicted = 0
+        self.expired = 0
+        self.compacted = 0
+        self.expanded = 0
+
+    @staticmethod
+    def estimate_size(messages: List[Dict]) -> int:
+        """Cheap byte estimate of a message list"""
+        return sum(len(m["content"]) + MESSAGE_OVERHEAD_BYTES for m in messages)
+
+    async def get(self, conversation_id: str, default=None):
+        entry = self._entries.get(conversation_id)
+        now = time.monotonic()
+
+        if entry is not None and now - entry.last_access > self.ttl_seconds:
+            self._remove(conversation_id)
+            self.expired += 1
+            entry = None
+
+        if entry is not None and self.backend is not None and (
+            (self.cache_seconds <= 0 or now - entry.loaded_at > self.cache_seconds)
+            and conversation_id not in self._pending
+            and conversation_id not in self._flushing
+        ):
+            # Another worker may have written this conversation since we cached it
+            self._remove(conversation_id)
+            entry = None
+
+        if entry is None:
+            messages = await self._load(conversation_id)
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                if messages is None:
+                    return default
+                self._insert(conversation_id, messages)
+                return messages
+            # Written while the backend read was in flight; that write is newer
+
+        entry.last_access = now
+        self._entries.move_to_end(conversation_id)
+        if isinstance(entry.messages, CompactHistory):
+            self._expand(entry)
+        return entry.messages
+
+    async def _load(self, conversation_id: str) -> Optional[List[Dict]]:
+        """Read-through to unflushed writes, then the shared backend"""
+        if self.backend is None:
+            return None
+
+        messages = self._pending.get(conversation_id) or self._flushing.get(conversation_id)
+        if messages is not None:
+            return messages
+
+        return await asyncio.to_thread(
+            self.backend.load, conversation_id, time.time() - self.ttl_seconds
+        )
+
+    def __setitem__(self, conversation_id: str, messages: List[Dict]):
+        self._insert(conversation_id, messages)
+        if self.backend is not None:
+            self._pending[conversation_id] = messages
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def pop(self, conversation_id: str, default=None):
+        self._pending.pop(conversation_id, None)
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.delete, conversation_id)
+        if conversation_id not in self._entries:
+            return default
+        entry = self._remove(conversation_id)
+        if isinstance(entry.messages, CompactHistory):
+            return entry.messages.expand()
+        return entry.messages
+
+    def _insert(self, conversation_id: str, messages: List[Dict]):
+        if conversation_id in self._entries:
+            self._remove(conversation_id)
+
+        size = self.estimate_size(messages)
+        self._entries[conversation_id] = _Entry(messages, time.monotonic(), size)
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, conversation_id: str) -> _Entry:
+        entry = self._entries.pop(conversation_id)
+        self._bytes -= entry.size
+        return entry
+
+    def _evict(self):
+        """Drop least recently used conversations until within bounds"""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evicted += 1
+
+    def _expand(self, entry: _Entry):
+        messages = entry.messages.expand()
+        size = self.estimate_size(messages)
+        self._bytes += size - entry.size
+        entry.messages = messages
+        entry.size = size
+        self.expanded += 1
+        self._evict()
+
+    def compact(self) -> int:
+        """Pack conversations idle for compact_seconds, returning how many were packed"""
+        if self.compact_seconds <= 0:
+            return 0
+        cutoff = time.monotonic() - self.compact_seconds
+        packed = 0
+
+        # Entries are in access order, so walk back from the newest until
+        # reaching the ones an earlier pass already packed
+        for entry in reversed(self._entries.values()):
+            if entry.last_access > cutoff:
+                continue
+            if isinstance(entry.messages, CompactHistory):
+                break
+            compact = CompactHistory.pack(entry.messages, self.compress)
+            if compact is None:
+                continue
+            size = compact.size()
+            self._bytes += size - entry.size
+            entry.messages = compact
+            entry.size = size
+            packed += 1
+
+        self.compacted += packed
+        return packed
+
+    def sweep(self) -> int:
+        """Remove idle conversations past their TTL, returning how many were dropped"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        removed = 0
+
+        while self._entries:
+            conversation_id, entry = next(iter(self._entries.items()))
+            if entry.last_access > cutoff:
+                break
+            self._remove(conversation_id)
+            removed += 1
+
+        self.expired += removed
+        return removed
+
+    async def flush(self):
+        """Write queued conversations to the backend in one batch"""
+        if self.backend is None or not self._pending:
+            return
+
+        # Snapshot the lists so in-place appends during the write don't race
+        self._flushing = {cid: list(messages) for cid, messages in self._pending.items()}
+        self._pending = {}
+        try:
+            await asyncio.to_thread(self.backend.save_many, self._flushing)
+        except Exception as e:
+            print(f"Conversation flush error: {str(e)}")
+            for conversation_id, messages in self._flushing.items():
+                self._pending.setdefault(conversation_id, messages)
+        finally:
+            self._flushing = {}
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+            self.compact()
+            if self.backend is not None:
+                try:
+                    await asyncio.to_thread(
+                        self.backend.purge_older_than, time.time() - self.ttl_seconds
+                    )
+                except Exception as e:
+                    print(f"Conversation purge error: {str(e)}")
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Start the background sweeper (and batch flusher) on the running event loop"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._sweep_forever()))
+        if self.backend is not None:
+            self._tasks.append(asyncio.create_task(self._flush_forever()))
+
+    async def stop(self):
+        """Cancel background tasks and flush outstanding writes"""
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        if self.backend is not None:
+            await self.flush()
+            self.backend.close()
+
+    def stats(self) -> Dict:
+        """Live counts and byte estimates for sizing workers"""
+        return {
+            "backend": self.backend.name if self.backend is not None else "memory",
+            "conversations": len(self._entries),
+            "messages": sum(len(entry.messages) for entry in self._entries.values()),
+            "estimated_bytes": self._bytes,
+            "compact": sum(
+                1 for entry in self._entries.values() if isinstance(entry.messages, CompactHistory)
+            ),
+            "compacted": self.compacted,
+            "expanded": self.expanded,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "pending_writes": len(self._pending),
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
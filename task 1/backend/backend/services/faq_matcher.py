@@ -0,0 +1,99 @@
+import math
+import os
+import re
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.retrieval import stem, tokenize
+
+_WORD = re.compile(r"[a-z0-9+]+")
+
+
+class FAQMatch:
+    """An FAQ matched to a user message, with related questions for suggestions"""
+
+    __slots__ = ("question", "answer", "score", "related")
+
+    def __init__(self, question: str, answer: str, score: float, related: List[str]):
+        self.question = question
+        self.answer = answer
+        self.score = score
+        self.related = related
+
+
+class FAQMatcher:
+    """
+    Offline FAQ matcher using hashed TF-IDF vectors and cosine similarity.
+
+    Each FAQ question is turned into stemmed unigram and bigram features,
+    hashed into a fixed number of dimensions and stored as a row of an
+    L2-normalized NumPy matrix, so matching is one matrix-vector product.
+    A match also needs every content word of the message in the FAQ question,
+    so "Is Iron Lady for men?" does not get the answer to "Who is Iron Lady
+    for?" however close the vectors are.
+    """
+
+    def __init__(self, faqs: List[Dict], dimensions: int = 2048, threshold: float = None):
+        self.faqs = faqs
+        self.dimensions = dimensions
+        self.threshold = threshold or float(os.getenv("FAQ_MATCH_THRESHOLD", 0.6))
+
+        features = [self._features(faq["question"]) for faq in faqs]
+        self._terms = [frozenset(tokenize(faq["question"])) for faq in faqs]
+
+        # Smoothed IDF per hashed bucket; buckets never seen in an FAQ get the maximum
+        df = np.zeros(dimensions, dtype=np.float32)
+        for bucket_counts in features:
+            for bucket in bucket_counts:
+                df[bucket] += 1
+        self._idf = (np.log((1 + len(faqs)) / (1 + df)) + 1).astype(np.float32)
+
+        self._matrix = np.stack([self._vector(f) for f in features]) if faqs else (
+            np.zeros((0, dimensions), dtype=np.float32)
+        )
+
+    def _features(self, text: str) -> Dict[int, int]:
+        """Hashed unigram and bigram counts"""
+        words = [stem(word) for word in _WORD.findall(text.lower())]
+        terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        counts: Dict[int, int] = {}
+        for term in terms:
+            bucket = zlib.crc32(term.encode()) % self.dimensions
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def _vector(self, counts: Dict[int, int]) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for bucket, count in counts.items():
+            vector[bucket] = (1 + math.log(count)) * self._idf[bucket]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def similarities(self, messages: List[str]) -> np.ndarray:
+        """Cosine similarity of each message against every FAQ, as a batch"""
+        queries = np.stack([self._vector(self._features(m)) for m in messages])
+        return queries @ self._matrix.T
+
+    def match(self, message: str, related: int = 3) -> Optional[FAQMatch]:
+        """Return the best FAQ if it clears the confidence threshold"""
+        if not self.faqs:
+            return None
+
+        scores = self.similarities([message])[0]
+        ranked = np.argsort(-scores)
+        best = int(ranked[0])
+        if scores[best] < self.threshold:
+            return None
+        if not self._terms[best].issuperset(tokenize(message)):
+            return None
+
+        faq = self.faqs[best]
+        return FAQMatch(
+            faq["question"],
+            faq["answer"],
+            float(scores[best]),
+            [self.faqs[int(i)]["question"] for i in ranked[1:related + 1]]
+        )
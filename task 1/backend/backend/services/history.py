@@ -0,0 +1,94 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Stored conversations may start with one message of this role holding the
+# rolling summary of older turns; it is never sent to the provider as-is
+SUMMARY_ROLE = "summary"
+
+SUMMARY_PROMPT = """Summarize this conversation between a woman and the Iron Lady assistant in under 120 words.
+Keep her goals, career stage, programs discussed, questions still open and any personal details she shared.
+Write plain sentences with no preamble."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+class HistoryWindow:
+    """
+    Token-aware context assembly for a conversation.
+
+    Recent turns are packed newest-first into a per-request token budget, and
+    once the unsummarized history grows past a threshold the older turns are
+    folded into a rolling summary (produced in the background by the caller).
+    """
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        summary_trigger: int = None,
+        keep_recent: int = None,
+        max_messages: int = None
+    ):
+        self.token_budget = token_budget or int(os.getenv("HISTORY_TOKEN_BUDGET", 1500))
+        self.summary_trigger = summary_trigger or int(os.getenv("HISTORY_SUMMARY_TRIGGER", 1200))
+        self.keep_recent = keep_recent or int(os.getenv("HISTORY_KEEP_RECENT", 4))
+        self.max_messages = max_messages or int(os.getenv("HISTORY_MAX_MESSAGES", 40))
+
+    @staticmethod
+    def split(conversation: List[Dict]) -> Tuple[Optional[str], List[Dict]]:
+        """Separate the rolling summary from the remaining messages"""
+        if conversation and conversation[0]["role"] == SUMMARY_ROLE:
+            return conversation[0]["content"], conversation[1:]
+        return None, conversation
+
+    def window(self, conversation: List[Dict]) -> Tuple[Optional[str], List[Dict], int]:
+        """Return the summary and the newest messages that fit the token budget"""
+        summary, messages = self.split(conversation)
+        used = estimate_tokens(summary) if summary else 0
+
+        start = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            cost = estimate_tokens(messages[i]["content"])
+            # The latest message is always sent, even if it alone exceeds the budget
+            if used + cost > self.token_budget and start < len(messages):
+                break
+            used += cost
+            start = i
+
+        # Providers expect the history to open with a user turn
+        while start < len(messages) - 1 and messages[start]["role"] != "user":
+            used -= estimate_tokens(messages[start]["content"])
+            start += 1
+
+        return summary, messages[start:], used
+
+    def needs_summary(self, conversation: List[Dict]) -> bool:
+        _, messages = self.split(conversation)
+        if len(messages) <= self.keep_recent:
+            return False
+        return sum(estimate_tokens(m["content"]) for m in messages) > self.summary_trigger
+
+    def summary_request(self, conversation: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Return the older messages to fold in and the prompt that summarizes them"""
+        summary, messages = self.split(conversation)
+        older = messages[:-self.keep_recent]
+
+        transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in older)
+        if summary:
+            transcript = f"EARLIER SUMMARY: {summary}\n\n{transcript}"
+
+        return older, [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": transcript},
+        ]
+
+    def trim(self, conversation: List[Dict]) -> List[Dict]:
+        """Hard cap on stored messages, keeping the summary"""
+        summary, messages = self.split(conversation)
+        if len(messages) <= self.max_messages:
+            return conversation
+
+        kept = messages[-self.max_messages:]
+        return ([conversation[0]] + kept) if summary else kept
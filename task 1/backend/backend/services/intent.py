@@ -0,0 +1,148 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+PROGRAMS = "programs"
+ENROLLMENT = "enrollment"
+PRICING = "pricing"
+SCHEDULE = "schedule"
+GENERAL = "general"
+
+# Keyword forms per intent, in priority order (first intent wins on ties)
+INTENT_KEYWORDS = [
+    (PROGRAMS, ["program", "programs", "programm", "programms", "programe", "programes",
+                "programme", "programmes", "course", "courses", "offer", "offers", "offered",
+                "offering", "available"]),
+    (ENROLLMENT, ["enrol", "enroll", "enrolls", "enrolled", "enrolling", "enrollment", "enrolment",
+                  "apply", "applying", "applied", "application", "join", "joins", "joined",
+                  "joining", "signup", "register"]),
+    (PRICING, ["cost", "costs", "price", "prices", "pricing", "fee", "fees", "tuition",
+               "payment", "payments"]),
+    (SCHEDULE, ["schedule", "schedules", "scheduled", "scheduling", "duration", "time", "times",
+                "timing", "timings", "when"]),
+]
+# Two-word keywords, matched on consecutive words
+INTENT_PHRASES = {
+    ("sign", "up"): ENROLLMENT,
+    ("signing", "up"): ENROLLMENT,
+}
+
+# Base words eligible for typo matching. Keywords shorter than six letters
+# are one edit away from too many real words ("apply" / "happy", "price" /
+# "prince"), so they only match exactly
+TYPO_KEYWORDS = {
+    PROGRAMS: ["program", "programs", "programme", "course", "courses", "available"],
+    ENROLLMENT: ["enroll", "enrollment", "application", "register"],
+    PRICING: ["tuition", "payment"],
+    SCHEDULE: ["schedule", "duration", "timing"],
+}
+TYPO_MIN_LENGTH = 6
+
+_WORD = re.compile(r"[a-z]+")
+_TYPO_CANDIDATE = re.compile(r"[a-z]{%d,}" % TYPO_MIN_LENGTH)
+
+
+def vocabulary(text: str) -> FrozenSet[str]:
+    """Lowercase words of a text, for IntentEngine.known_words"""
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def _deletes(word: str) -> List[str]:
+    """All strings one deletion away from word"""
+    return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def _one_edit_apart(word: str, keyword: str) -> bool:
+    """One insertion, deletion, substitution or adjacent transposition apart"""
+    if len(word) == len(keyword):
+        diff = [i for i, (a, b) in enumerate(zip(word, keyword)) if a != b]
+        if len(diff) == 1:
+            return True
+        i = diff[0] if len(diff) == 2 else None
+        return i is not None and diff[1] == i + 1 and word[i] == keyword[i + 1] and word[i + 1] == keyword[i]
+
+    shorter, longer = sorted((word, keyword), key=len)
+    if len(longer) - len(shorter) != 1:
+        return False
+    for i, (a, b) in enumerate(zip(shorter, longer)):
+        if a != b:
+            return shorter[i:] == longer[i + 1:]
+    return True
+
+
+class IntentEngine:
+    """
+    Single-pass intent classifier for fallback responses and suggestions.
+
+    A message is split into words once and intersected with the set of all
+    keyword forms; the highest priority intent among the hits wins. When
+    nothing matches exactly, words not in known_words (e.g. the knowledge
+    base vocabulary) are checked for a typo of a keyword: a deletion index
+    (SymSpell style) finds candidates, which must keep the first letter and be
+    a single edit away, so "progam" and "shedule" match but "corpse" or
+    "source" do not match "course".
+    """
+
+    def __init__(self, known_words: Iterable[str] = ()):
+        self._intents = [intent for intent, _ in INTENT_KEYWORDS]
+        self._priority = {intent: i for i, intent in enumerate(self._intents)}
+        # Keyword form -> priority of its intent
+        self._ranks: Dict[str, int] = {
+            word: self._priority[intent] for intent, words in INTENT_KEYWORDS for word in words
+        }
+        self._keyword_set = frozenset(self._ranks)
+        self._phrase_starts = frozenset(first for first, _ in INTENT_PHRASES)
+        self.known_words: FrozenSet[str] = frozenset(known_words)
+
+        # Deletion variant -> keywords it came from
+        self._typo_index: Dict[str, Tuple[str, ...]] = {}
+        for words in TYPO_KEYWORDS.values():
+            for word in words:
+                for variant in [word] + _deletes(word):
+                    self._typo_index[variant] = self._typo_index.get(variant, ()) + (word,)
+        self._typo_intents = {word: intent for intent, words in TYPO_KEYWORDS.items() for word in words}
+
+        # Word-level memo so repeated vocabulary skips the deletion lookup
+        self._typo_intent = lru_cache(maxsize=8192)(self._lookup_typo)
+
+    def classify(self, message: str) -> str:
+        """Return the highest priority intent mentioned in the message"""
+        message_lower = message.lower()
+        words = _WORD.findall(message_lower)
+        ranks = self._ranks
+        best = min((ranks[word] for word in self._keyword_set.intersection(words)), default=None)
+
+        if (best is None or best > 0) and not self._phrase_starts.isdisjoint(words):
+            for first, second in zip(words, words[1:]):
+                intent = INTENT_PHRASES.get((first, second))
+                if intent is not None and (best is None or self._priority[intent] < best):
+                    best = self._priority[intent]
+        if best is not None:
+            return self._intents[best]
+
+        return self._classify_typos(message_lower)
+
+    def _lookup_typo(self, word: str) -> Optional[str]:
+        candidates = set(self._typo_index.get(word, ()))
+        for variant in _deletes(word):
+            candidates.update(self._typo_index.get(variant, ()))
+
+        best = None
+        for keyword in candidates:
+            if keyword[0] != word[0] or not _one_edit_apart(word, keyword):
+                continue
+            intent = self._typo_intents[keyword]
+            if best is None or self._priority[intent] < self._priority[best]:
+                best = intent
+        return best
+
+    def _classify_typos(self, message_lower: str) -> str:
+        best = None
+        # Only words long enough to be a typo that the knowledge base does not use
+        for word in set(_TYPO_CANDIDATE.findall(message_lower)).difference(self.known_words):
+            intent = self._typo_intent(word)
+            if intent is not None and (
+                best is None or self._priority[intent] < self._priority[best]
+            ):
+                best = intent
+        return best or GENERAL
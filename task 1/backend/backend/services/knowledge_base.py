@@ -1,213 +1,200 @@
-from typing import Dict, List
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional
+import asyncio
+import hashlib
+import json
+import os
+
+from services.faq_matcher import FAQMatcher
+from services.intent import vocabulary
+from services.retrieval import KnowledgeIndex
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge_base.json"
+)
+
+
+class KnowledgeSnapshot(NamedTuple):
+    """
+    Immutable, versioned view of the knowledge base together with everything
+    precomputed from it. A new snapshot is built for every load and swapped in
+    whole, so a request never sees half of one version and half of another.
+    """
+
+    version: str
+    programs: List[Dict]
+    faqs: List[Dict]
+    enrollment_info: Dict
+    context: str
+    index: KnowledgeIndex
+    faq_matcher: FAQMatcher
+    programs_payload: bytes
+    vocabulary: FrozenSet[str]
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "KnowledgeSnapshot":
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        programs = data["programs"]
+
+        return cls(
+            version=hashlib.sha256(canonical.encode()).hexdigest()[:12],
+            programs=programs,
+            faqs=data["faqs"],
+            enrollment_info=data["enrollment_info"],
+            context=_format_context(programs, data["enrollment_info"]),
+            index=KnowledgeIndex(data),
+            faq_matcher=FAQMatcher(data["faqs"]),
+            programs_payload=json.dumps({"programs": programs}).encode(),
+            vocabulary=vocabulary(canonical)
+        )
+
+
+def _format_context(programs: List[Dict], enrollment_info: Dict) -> str:
+    """Formatted knowledge base context for AI prompts"""
+    lines = ["PROGRAMS:", ""]
+
+    for program in programs:
+        lines.append(f"• {program['name']}")
+        lines.append(f"  Duration: {program['duration']}")
+        lines.append(f"  Price: {program['price']}")
+        lines.append(f"  Format: {program['format']}")
+        lines.append(f"  Description: {program['description']}")
+        lines.append("")
+
+    lines.append("")
+    lines.append("ENROLLMENT PROCESS:")
+    for i, step in enumerate(enrollment_info['steps'], 1):
+        lines.append(f"{i}. {step}")
+
+    contact = enrollment_info['contact']
+    lines.append("")
+    lines.append("CONTACT & COMMUNITY:")
+    lines.append(f"Phone: {contact['phone']}")
+    lines.append(f"Website: {contact['website']}")
+    lines.append(f"Mission: {contact['mission']}")
+    lines.append(f"Community: {contact['community_size']}")
+
+    return "\n".join(lines) + "\n"
 
 
 class KnowledgeBase:
     """
-    Knowledge base containing information about Iron Lady programs and services
+    Knowledge base containing information about Iron Lady programs and services.
+
+    Content is loaded from a JSON (or YAML) data file and watched for changes;
+    every successful load produces a new KnowledgeSnapshot that is atomically
+    swapped in while requests keep being served from the previous one.
     """
-    
-    def __init__(self):
-        self.programs = self._load_programs()
-        self.faqs = self._load_faqs()
-        self.enrollment_info = self._load_enrollment_info()
-    
-    def _load_programs(self) -> List[Dict]:
-        """Load program information"""
-        return [
-            {
-                "name": "Leadership Essentials Program",
-                "duration": "Flexible cohort-based learning",
-                "format": "Hybrid (Online + In-person workshops)",
-                "price": "Contact for pricing",
-                "description": "Are you often asked to 'Learn to BALANCE'? Do you feel 'Guilty' about being Ambitious? This program teaches you the art of maximizing, shameless pitching, and dealing with office politics and biases. Be unapologetically ambitious.",
-                "highlights": [
-                    "Master the art of maximizing without guilt",
-                    "Shameless pitching and self-advocacy",
-                    "Navigate office politics and combat biases",
-                    "Unapologetic ambition development",
-                    "Break free from 'balance' expectations"
-                ],
-                "target_audience": "Women professionals aspiring for growth",
-                "prerequisites": "Open to ambitious women at all career levels",
-                "key_outcomes": "Become unapologetically ambitious and master workplace warfare tactics"
-            },
-            {
-                "name": "100 Board Members Program",
-                "duration": "Intensive fast-track program",
-                "format": "Comprehensive online + exclusive networking events",
-                "price": "Premium investment - Contact for details",
-                "description": "Feeling stuck at the same level in your career with no tactics working? This program teaches innovative techniques to fast-track your overdue growth and break through career plateaus.",
-                "highlights": [
-                    "Innovative breakthrough techniques",
-                    "Fast-track career advancement strategies",
-                    "Board-level positioning and visibility",
-                    "Strategic networking for top positions",
-                    "Break through career stagnation"
-                ],
-                "target_audience": "Mid to senior-level women leaders ready for breakthrough",
-                "prerequisites": "Current leadership role or extensive professional experience",
-                "key_outcomes": "Achieve the breakthrough and growth you deserve"
-            },
-            {
-                "name": "Master of Business Warfare",
-                "duration": "Comprehensive flagship program",
-                "format": "Elite cohort with global practitioners",
-                "price": "Premium - Investment for C-suite aspirants",
-                "description": "Committed to reaching the C-suite but don't know how? Is 1+ Crore income your dream? This flagship program teaches cutting-edge business warfare tactics for breakthrough results in your career.",
-                "highlights": [
-                    "C-suite pathway strategies",
-                    "Business warfare tactics from global practitioners",
-                    "Achieve 1+ Crore income goals",
-                    "Win without making others lose",
-                    "Transformative results in minimal time",
-                    "Join 78,000+ Women Leaders' Ecosystem"
-                ],
-                "target_audience": "Senior professionals and entrepreneurs targeting C-suite",
-                "prerequisites": "Significant professional experience and serious commitment",
-                "key_outcomes": "Master business warfare tactics for C-suite success and exceptional income growth"
-            },
-            {
-                "name": "Business War Tactics Masterclass",
-                "duration": "Intensive workshop series",
-                "format": "Interactive sessions + practical implementation",
-                "price": "Contact for latest offerings",
-                "description": "Learn to implement strategies that generate transformative results in the smallest possible time. Develop an unapologetic winning mindset - stop 'just adjusting', 'suffering', or 'stop dreaming'.",
-                "highlights": [
-                    "Fast-track growth strategies",
-                    "Winning without others losing",
-                    "Combat office politics effectively",
-                    "Develop unapologetic winning mindset",
-                    "Learn from global practitioners' expertise"
-                ],
-                "target_audience": "Women professionals and business owners",
-                "prerequisites": "Open to all ambitious women leaders",
-                "key_outcomes": "Achieve breakthrough results fast"
-            },
-            {
-                "name": "Winning Mindset Development",
-                "duration": "Transformative coaching program",
-                "format": "Group coaching + personal sessions",
-                "price": "Contact for details",
-                "description": "We enable women to develop mindsets towards 'Winning'. Winning doesn't mean others need to lose! Stop being told to 'suffer', 'just adjust', and 'stop dreaming'. Join our non-judgmental community that celebrates ambitions.",
-                "highlights": [
-                    "Develop unapologetic winning mindset",
-                    "Win without fighting (even if challenged)",
-                    "Personal learnings and growth experiences",
-                    "Join supportive, non-judgmental community",
-                    "Celebrate your ambitions and successes"
-                ],
-                "target_audience": "Women seeking career change/restart and entrepreneurs",
-                "prerequisites": "Commitment to personal transformation",
-                "key_outcomes": "Develop an unapologetic winning mindset"
-            }
-        ]
-    
-    def _load_faqs(self) -> List[Dict]:
-        """Load frequently asked questions"""
-        return [
-            {
-                "question": "Who is Iron Lady for?",
-                "answer": "Iron Lady is for ambitious women who refuse to 'just adjust' or 'stop dreaming'. Our community includes: Professionals aspiring for growth, Entrepreneurs/Business Women/Self-employed, and Women seeking career change or restart. We're for women who want to WIN unapologetically!"
-            },
-            {
-                "question": "What makes Iron Lady different?",
-                "answer": "We don't teach you to 'balance' or 'suffer' - we teach you to WIN! Our approach combines 'breakthrough' and 'results-focused' thinking with Business War Tactics. We're unconventionally taking risks and judging non-judgmentally. Iron Lady communities share real ambitions, celebrate each other's successes, and practice tactics used by global practitioners, entrepreneurs, and CEOs who have become award-winners."
-            },
-            {
-                "question": "What is Business Warfare?",
-                "answer": "Business War Tactics enable women to learn to win without fighting! Our tactics implement strategies that generate transformative results in the smallest possible time. We teach winning formulas and methodologies from global practitioners' expertise, combined with personal learnings and experiences."
-            },
-            {
-                "question": "Can I really achieve C-suite level and 1+ Crore income?",
-                "answer": "Absolutely! Our Master of Business Warfare program is specifically designed for this. We teach cutting-edge business warfare tactics practiced by global practitioners. Remember: Winning doesn't mean others need to lose! Join our 78,000+ Women Leaders' Ecosystem."
-            },
-            {
-                "question": "How do I join the Iron Lady community?",
-                "answer": "Contact us at +91-6360823123 or explore our programs. We have programs for different career stages and goals. Whether you're stuck at the same level, feel guilty about ambition, or ready for the C-suite, we have a path for you."
-            },
-            {
-                "question": "Are the programs available internationally?",
-                "answer": "Yes! Our content is created, used, and practiced by global practitioners, entrepreneurs, and CEOs. We offer online and hybrid formats accessible worldwide, with our community spanning across the globe."
-            },
-            {
-                "question": "What is the Iron Lady mission?",
-                "answer": "ELEVATING A MILLION WOMEN TO THE TOP. We enable women to develop mindsets towards 'Winning' through our non-judgmental, celebration-focused learning sessions. Every woman is common in being uncommon in the business world - we celebrate that!"
-            }
-        ]
-    
-    def _load_enrollment_info(self) -> Dict:
-        """Load enrollment process information"""
-        return {
-            "steps": [
-                "Explore our programs and choose the one aligned with your breakthrough goals",
-                "Contact us at +91-6360823123 or through our website",
-                "Schedule a consultation to discuss your ambitions and goals",
-                "Receive program details, investment information, and next cohort dates",
-                "Join the Iron Lady community and start your transformation",
-                "Become part of our 78,000+ Women Leaders' Ecosystem"
-            ],
-            "requirements": [
-                "Commitment to your own growth and success",
-                "Willingness to embrace an unapologetic winning mindset",
-                "Readiness to challenge 'balance' and 'adjust' mentality",
-                "Ambition to achieve breakthrough results"
-            ],
-            "payment_options": [
-                "Contact our team for program investment details",
-                "Flexible payment options available",
-                "Corporate sponsorship programs",
-                "Special offers for group enrollments"
-            ],
-            "start_dates": "Multiple cohorts throughout the year - Contact for latest schedule",
-            "contact": {
-                "phone": "+91-6360823123",
-                "website": "www.ironlady.com",
-                "mission": "ELEVATING A MILLION WOMEN TO THE TOP",
-                "community_size": "78,000+ Women Leaders' Ecosystem"
-            },
-            "who_should_join": [
-                "Professionals aspiring for growth",
-                "Entrepreneurs/Business Women/Self-employed",
-                "Women seeking career change/restart"
-            ]
-        }
-    
+
+    def __init__(self, path: Optional[str] = None, poll_interval: float = None):
+        self.path = path or os.getenv("KNOWLEDGE_BASE_PATH", DEFAULT_PATH)
+        self.poll_interval = poll_interval or float(os.getenv("KNOWLEDGE_BASE_POLL_SECONDS", 2))
+        self._listeners: List[Callable[[KnowledgeSnapshot], None]] = []
+        self._watcher: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+        self._mtime = os.path.getmtime(self.path)
+        self.snapshot = KnowledgeSnapshot.from_data(self._read())
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    @property
+    def programs(self) -> List[Dict]:
+        return self.snapshot.programs
+
+    @property
+    def faqs(self) -> List[Dict]:
+        return self.snapshot.faqs
+
+    @property
+    def enrollment_info(self) -> Dict:
+        return self.snapshot.enrollment_info
+
+    def _read(self) -> Dict:
+        """Read program, FAQ and enrollment data from the data file"""
+        with open(self.path, encoding="utf-8") as f:
+            if self.path.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError:
+                    raise RuntimeError("PyYAML is required for YAML knowledge base files")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+
+        for key in ("programs", "faqs", "enrollment_info"):
+            if key not in data:
+                raise ValueError(f"Knowledge base file is missing '{key}'")
+        return data
+
+    def add_listener(self, callback: Callable[[KnowledgeSnapshot], None]):
+        """Call back with the new snapshot whenever the knowledge base changes"""
+        self._listeners.append(callback)
+
+    async def reload(self) -> bool:
+        """Load the data file and swap in a new snapshot if its content changed"""
+        try:
+            snapshot = await asyncio.to_thread(lambda: KnowledgeSnapshot.from_data(self._read()))
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️  Knowledge base reload failed, keeping version {self.version}: {str(e)}")
+            return False
+
+        self.last_error = None
+        if snapshot.version == self.version:
+            return False
+
+        self.snapshot = snapshot
+        print(f"📚 Knowledge base updated to version {snapshot.version}")
+        for callback in self._listeners:
+            callback(snapshot)
+        return True
+
+    async def _watch_forever(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                continue
+            if mtime != self._mtime:
+                await self.reload()
+                # A failed read (e.g. a half-written file) is retried on the next poll
+                if self.last_error is None:
+                    self._mtime = mtime
+
+    def start(self):
+        """Watch the data file for changes on the running event loop"""
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch_forever())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
     def get_context(self) -> str:
         """Get formatted context for the AI prompt"""
-        context = "PROGRAMS:\n\n"
-        
-        for program in self.programs:
-            context += f"• {program['name']}\n"
-            context += f"  Duration: {program['duration']}\n"
-            context += f"  Price: {program['price']}\n"
-            context += f"  Format: {program['format']}\n"
-            context += f"  Description: {program['description']}\n\n"
-        
-        context += "\nENROLLMENT PROCESS:\n"
-        for i, step in enumerate(self.enrollment_info['steps'], 1):
-            context += f"{i}. {step}\n"
-        
-        context += f"\nCONTACT & COMMUNITY:\n"
-        context += f"Phone: {self.enrollment_info['contact']['phone']}\n"
-        context += f"Website: {self.enrollment_info['contact']['website']}\n"
-        context += f"Mission: {self.enrollment_info['contact']['mission']}\n"
-        context += f"Community: {self.enrollment_info['contact']['community_size']}\n"
-        
-        return context
-    
+        return self.snapshot.context
+
     def get_programs_info(self) -> List[Dict]:
         """Get all programs information"""
         return self.programs
-    
+
     def search_programs(self, query: str) -> List[Dict]:
         """Search programs based on query"""
         query_lower = query.lower()
         results = []
-        
+
         for program in self.programs:
-            if (query_lower in program['name'].lower() or 
+            if (query_lower in program['name'].lower() or
                 query_lower in program['description'].lower() or
                 any(query_lower in highlight.lower() for highlight in program['highlights'])):
                 results.append(program)
-        
+
         return results
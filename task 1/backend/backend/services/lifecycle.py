@@ -0,0 +1,69 @@
+import os
+import signal
+import time
+from typing import Dict
+
+STARTING = "starting"
+WARMING = "warming"
+SERVING = "serving"
+DRAINING = "draining"
+
+
+class Lifecycle:
+    """
+    Process state for load balancer probes.
+
+    starting -> warming (serving fallbacks while the LLM provider stack loads)
+    -> serving, and draining once a shutdown signal arrives. Readiness is only
+    reported while serving, so traffic is sent to a worker after it can reach
+    the LLM and stops before it goes away; liveness holds in every state.
+    """
+
+    def __init__(self, grace_seconds: float = None):
+        self.grace_seconds = grace_seconds or float(os.getenv("SHUTDOWN_GRACE_SECONDS", 30))
+        self.state = STARTING
+        self.changed_at = time.time()
+
+    def set(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.changed_at = time.time()
+            print(f"🚦 Worker {os.getpid()} is {state}")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == SERVING
+
+    def watch_signals(self):
+        """
+        Flip to draining as soon as SIGTERM/SIGINT arrives, before the server
+        starts closing connections, then hand the signal on to the server.
+        Must run after the server installed its own handlers (i.e. in lifespan).
+        """
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                previous = signal.getsignal(sig)
+            except ValueError:
+                return
+
+            def handler(signum, frame, previous=previous):
+                self.set(DRAINING)
+                if callable(previous):
+                    previous(signum, frame)
+                else:
+                    # No server handler to pass to; restore the default action
+                    signal.signal(signum, previous)
+                    signal.raise_signal(signum)
+
+            try:
+                signal.signal(sig, handler)
+            except ValueError:
+                # Signals can only be handled from the main thread (e.g. not under TestClient)
+                return
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "since": self.changed_at,
+            "pid": os.getpid(),
+        }
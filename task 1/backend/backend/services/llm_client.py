@@ -0,0 +1,382 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from services import metrics
+from services.circuit_breaker import CircuitBreaker
+from services.llm_transport import RecordReplayTransport, create_transport
+
+
+# LiteLLM pulls in the Google and OpenAI client stacks (about two seconds of
+# imports), so it is loaded on first use or by LLMClient.warm_up(), never at
+# import time; fallback-only deployments never load it at all
+acompletion = None
+
+
+def load_provider():
+    """Import LiteLLM once and return its acompletion"""
+    global acompletion
+    if acompletion is None:
+        from litellm import acompletion as litellm_acompletion
+        acompletion = litellm_acompletion
+    return acompletion
+
+
+async def _live_acompletion(**kwargs):
+    if acompletion is None:
+        # First call before the background warm-up finished; keep the loop free
+        await asyncio.to_thread(load_provider)
+    return await acompletion(**kwargs)
+
+
+def _delta_text(chunk) -> Optional[str]:
+    """Text of a streamed chunk; usage-only chunks have no choices"""
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+class LLMOverloadedError(Exception):
+    """Raised when the wait queue for an upstream slot is full"""
+
+
+class LLMClient:
+    """
+    Async wrapper around LiteLLM with a concurrency cap, a bounded wait queue
+    and per-call timeouts, so slow upstream calls never block the event loop
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int = None,
+        max_queue: int = None,
+        timeout: float = None,
+        stream_idle_timeout: float = None,
+        api_base: Optional[str] = None,
+        api_key: Optional[str] = None,
+        transport: Optional[RecordReplayTransport] = None,
+        hedge_model: Optional[str] = None,
+        hedge_delay: float = None
+    ):
+        self.model = model
+        # Faster secondary model raced against slow or failing primary calls
+        self.hedge_model = hedge_model
+        self.hedge_delay = hedge_delay or float(os.getenv("LLM_HEDGE_DELAY_SECONDS", 2))
+        self.breaker = CircuitBreaker(model)
+        self.hedge_breaker = CircuitBreaker(hedge_model) if hedge_model else None
+        # One breaker per model, so a failing routed tier does not trip the others
+        self._breakers = {model: self.breaker}
+        if hedge_model:
+            self._breakers[hedge_model] = self.hedge_breaker
+        # Record/replay archive for reproducible runs; None calls the provider directly
+        self.transport = transport if transport is not None else create_transport()
+        # Set for OpenAI-compatible endpoints (e.g. the benchmark stub server)
+        self._provider_kwargs = {"api_base": api_base, "api_key": api_key} if api_base else {}
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 64))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("LLM_MAX_QUEUE", 512))
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT_SECONDS", 30))
+        # Longest gap allowed between two streamed chunks after the first token
+        self.stream_idle_timeout = stream_idle_timeout or float(os.getenv("LLM_STREAM_IDLE_SECONDS", 15))
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.streams = 0
+        self.first_token_seconds = 0.0
+        self.hedges = 0
+        self.hedge_wins = 0
+        # Recent primary latencies (full completion / time to first token)
+        self._latencies = {"complete": deque(maxlen=256), "stream": deque(maxlen=256)}
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        hedge_messages: Optional[List[Dict]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Run a single completion once a concurrency slot is free (model defaults to the primary)"""
+        async def call(
+            model: str,
+            breaker: CircuitBreaker,
+            model_messages: List[Dict],
+            model_kwargs: Dict
+        ):
+            breaker.before_call()
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self._acompletion(
+                        model=model,
+                        messages=model_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        timeout=self.timeout,
+                        **self._provider_kwargs,
+                        **model_kwargs
+                    ),
+                    timeout=self.timeout
+                )
+            except asyncio.CancelledError:
+                breaker.cancel()
+                raise
+            except Exception as e:
+                breaker.record(False, time.perf_counter() - started)
+                metrics.UPSTREAM_ERRORS.inc(type(e).__name__)
+                raise
+            elapsed = time.perf_counter() - started
+            breaker.record(True, elapsed)
+            metrics.LLM_SECONDS.observe(elapsed, "complete")
+            if model == self.model:
+                self._latencies["complete"].append(elapsed)
+            return response
+
+        self._fail_fast(model)
+        async with self._slot():
+            response = await self._hedged(call, "complete", model, messages, hedge_messages, kwargs)
+
+        self._record_usage(getattr(response, "usage", None))
+        return response.choices[0].message.content
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        hedge_messages: Optional[List[Dict]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Yield completion tokens as they arrive, holding one slot for the whole stream"""
+        async def open_stream(
+            model: str,
+            breaker: CircuitBreaker,
+            model_messages: List[Dict],
+            model_kwargs: Dict
+        ):
+            # Returns once the first token arrives, so hedging races time to first token
+            async def first_token():
+                response = await self._acompletion(
+                    model=model,
+                    messages=model_messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=self.timeout,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self._provider_kwargs,
+                    **model_kwargs
+                )
+                chunks = response.__aiter__()
+                first = usage = None
+                async for chunk in chunks:
+                    usage = getattr(chunk, "usage", None) or usage
+                    first = _delta_text(chunk)
+                    if first:
+                        break
+                return chunks, first, usage
+
+            breaker.before_call()
+            started = time.perf_counter()
+            try:
+                # One deadline covers opening the stream and waiting for its first token
+                chunks, first, usage = await asyncio.wait_for(first_token(), timeout=self.timeout)
+            except asyncio.CancelledError:
+                breaker.cancel()
+                raise
+            except Exception as e:
+                breaker.record(False, time.perf_counter() - started)
+                metrics.UPSTREAM_ERRORS.inc(type(e).__name__)
+                raise
+
+            # Time to first token approximates prompt prefill time
+            elapsed = time.perf_counter() - started
+            breaker.record(True, elapsed)
+            self.streams += 1
+            self.first_token_seconds += elapsed
+            metrics.FIRST_TOKEN_SECONDS.observe(elapsed)
+            if model == self.model:
+                self._latencies["stream"].append(elapsed)
+            return started, first, chunks, usage
+
+        self._fail_fast(model)
+        async with self._slot():
+            started, first, chunks, usage = await self._hedged(
+                open_stream, "stream", model, messages, hedge_messages, kwargs
+            )
+            try:
+                if first:
+                    yield first
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.stream_idle_timeout)
+                    except StopAsyncIteration:
+                        break
+                    # Usage arrives on the final chunk, which carries no choices
+                    usage = getattr(chunk, "usage", None) or usage
+                    delta = _delta_text(chunk)
+                    if delta:
+                        yield delta
+            except Exception as e:
+                metrics.UPSTREAM_ERRORS.inc(type(e).__name__)
+                raise
+            metrics.LLM_SECONDS.observe(time.perf_counter() - started, "stream")
+            self._record_usage(usage)
+
+    def _hedge_delay(self, kind: str) -> float:
+        """p95 latency of recent primary calls, never below the configured delay"""
+        samples = self._latencies[kind]
+        if len(samples) < 20:
+            return self.hedge_delay
+        ordered = sorted(samples)
+        return max(ordered[int(len(ordered) * 0.95)], self.hedge_delay)
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(model)
+        return breaker
+
+    def _fail_fast(self, model: Optional[str]):
+        """
+        Refuse a call before it queues for a slot when its circuit is open and
+        no hedge model could take it instead
+        """
+        model = model or self.model
+        breaker = self._breaker(model)
+        if breaker.available():
+            return
+        if self.hedge_model is not None and model != self.hedge_model and self.hedge_breaker.available():
+            return
+        # Raises CircuitOpenError and counts the rejection
+        breaker.before_call()
+
+    async def _hedged(
+        self,
+        call,
+        kind: str,
+        model: Optional[str],
+        messages: List[Dict],
+        hedge_messages,
+        kwargs: Dict
+    ):
+        """
+        Call the requested model; if it fails, or is still running once the
+        primary's p95 deadline passes, call the secondary model too and use
+        the first answer
+        """
+        model = model or self.model
+        if self.hedge_model is None or model == self.hedge_model:
+            return await call(model, self._breaker(model), messages, kwargs)
+
+        # Provider cache handles belong to the primary model
+        secondary_kwargs = {k: v for k, v in kwargs.items() if k != "cached_content"}
+        secondary_messages = hedge_messages or messages
+
+        primary = asyncio.ensure_future(call(model, self._breaker(model), messages, kwargs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(kind))
+            if done and primary.exception() is None:
+                return primary.result()
+
+            reason = "failed" if done else "slow"
+            metrics.HEDGED_REQUESTS.inc(reason)
+            self.hedges += 1
+            tasks.add(asyncio.ensure_future(
+                call(self.hedge_model, self.hedge_breaker, secondary_messages, secondary_kwargs)
+            ))
+
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both failed; report the primary's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _acompletion(self, **kwargs):
+        if self.transport is None:
+            return await _live_acompletion(**kwargs)
+        return await self.transport.acompletion(_live_acompletion, **kwargs)
+
+    async def warm_up(self) -> float:
+        """Import the provider stack off the event loop; returns the seconds it took"""
+        started = time.perf_counter()
+        if self.transport is None or self.transport.mode == "record":
+            await asyncio.to_thread(load_provider)
+        return time.perf_counter() - started
+
+    def _record_usage(self, usage):
+        if usage is None:
+            return
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.completion_tokens += usage.completion_tokens or 0
+        metrics.PROMPT_TOKENS.inc(amount=usage.prompt_tokens or 0)
+        metrics.COMPLETION_TOKENS.inc(amount=usage.completion_tokens or 0)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_prompt_tokens += getattr(details, "cached_tokens", None) or 0
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Reserve a concurrency slot, rejecting callers once the queue is full"""
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            metrics.UPSTREAM_ERRORS.inc(LLMOverloadedError.__name__)
+            raise LLMOverloadedError(
+                f"LLM queue full ({self.waiting} waiting, {self.in_flight} in flight)"
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """Current concurrency usage"""
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_first_token_seconds": (
+                self.first_token_seconds / self.streams if self.streams else None
+            ),
+            "transport": self.transport.stats() if self.transport is not None else "live",
+            "circuit": self.breaker.stats(),
+            "routed_circuits": {
+                name: breaker.stats() for name, breaker in self._breakers.items()
+                if breaker is not self.breaker and breaker is not self.hedge_breaker
+            },
+            "hedge_model": self.hedge_model,
+            "hedge_circuit": self.hedge_breaker.stats() if self.hedge_breaker is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
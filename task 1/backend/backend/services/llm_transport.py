@@ -0,0 +1,173 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+# Arguments that identify a completion; connection details and provider
+# cache handles change between runs without changing the answer
+KEY_FIELDS = ("model", "messages", "temperature", "max_tokens")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no recording exists for a request"""
+
+
+def request_key(kwargs: Dict) -> str:
+    """Stable hash of the messages and parameters of a completion request"""
+    canonical = json.dumps(
+        {field: kwargs.get(field) for field in KEY_FIELDS},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:24]
+
+
+def _usage(usage: Optional[Dict]):
+    return SimpleNamespace(prompt_tokens_details=None, **usage) if usage else None
+
+
+def _response(content: str, usage: Optional[Dict]):
+    """Minimal stand-in for a LiteLLM ModelResponse"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=_usage(usage)
+    )
+
+
+def _chunk(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class RecordReplayTransport:
+    """
+    Records LiteLLM completions to a gzip JSON-lines archive and replays them.
+
+    Each entry holds the streamed chunks with their offsets (ms from the start
+    of the call) and the reported token usage, keyed by a hash of the messages
+    and parameters. Replay reproduces the original token timings scaled by
+    `speed` (1 = as recorded, 0 = instant), so end-to-end timings of prompt
+    assembly, history handling and caching become repeatable without a network.
+    """
+
+    def __init__(self, mode: str, path: str, speed: float = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown LLM transport mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.speed = speed if speed is not None else float(os.getenv("LLM_REPLAY_SPEED", 1))
+        self.recordings: Dict[str, Dict] = self._load()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                print(f"⚠️  No LLM recordings at {self.path}; every call will miss")
+            return {}
+
+        recordings = {}
+        # Appended gzip members read back as one stream; later entries win
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                recordings[entry["key"]] = entry
+        print(f"📼 Loaded {len(recordings)} LLM recordings from {self.path}")
+        return recordings
+
+    def _append(self, entry: Dict):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    async def _save(self, key: str, chunks: List[str], offsets: List[int], usage):
+        entry = {"key": key, "c": chunks, "t": offsets}
+        if usage is not None:
+            entry["u"] = {
+                "prompt_tokens": usage.prompt_tokens or 0,
+                "completion_tokens": usage.completion_tokens or 0,
+            }
+        self.recordings[key] = entry
+        self.recorded += 1
+        await asyncio.to_thread(self._append, entry)
+
+    async def acompletion(self, live: Callable, **kwargs):
+        """Drop-in for litellm.acompletion; `live` makes the real call when recording"""
+        key = request_key(kwargs)
+        if self.mode == "replay":
+            entry = self._lookup(key)
+            if kwargs.get("stream"):
+                return self._replay_stream(entry)
+            return await self._replay_complete(entry)
+
+        started = time.perf_counter()
+        response = await live(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(key, response, started)
+
+        elapsed = int((time.perf_counter() - started) * 1000)
+        content = response.choices[0].message.content or ""
+        await self._save(key, [content], [elapsed], getattr(response, "usage", None))
+        return response
+
+    async def _record_stream(self, key: str, response, started: float) -> AsyncIterator:
+        chunks, offsets = [], []
+        usage = None
+        async for chunk in response:
+            # With stream_options include_usage the last chunk has usage and no choices
+            usage = getattr(chunk, "usage", None) or usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                chunks.append(delta)
+                offsets.append(int((time.perf_counter() - started) * 1000))
+            yield chunk
+        # Only complete streams are kept; an abandoned one is not a valid answer
+        await self._save(key, chunks, offsets, usage)
+
+    def _lookup(self, key: str) -> Dict:
+        entry = self.recordings.get(key)
+        if entry is None:
+            self.misses += 1
+            raise ReplayMissError(f"No LLM recording for request {key}")
+        self.hits += 1
+        return entry
+
+    async def _replay_complete(self, entry: Dict):
+        if entry["t"] and self.speed:
+            await asyncio.sleep(entry["t"][-1] / 1000 * self.speed)
+        return _response("".join(entry["c"]), entry.get("u"))
+
+    async def _replay_stream(self, entry: Dict) -> AsyncIterator:
+        started = time.perf_counter()
+        for content, offset in zip(entry["c"], entry["t"]):
+            if self.speed:
+                delay = offset / 1000 * self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield _chunk(content)
+        if entry.get("u"):
+            yield SimpleNamespace(choices=[], usage=_usage(entry["u"]))
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recordings": len(self.recordings),
+            "recorded": self.recorded,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_transport() -> Optional[RecordReplayTransport]:
+    """Build the transport selected by LLM_TRANSPORT (live, record or replay)"""
+    mode = os.getenv("LLM_TRANSPORT", "live").lower()
+    if mode == "live":
+        return None
+    return RecordReplayTransport(mode, os.getenv("LLM_RECORDINGS_PATH", "recordings/llm.jsonl.gz"))
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Default latency buckets in seconds (Prometheus client defaults plus sub-millisecond)
+LATENCY_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for label_values, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float] = None):
+        super().__init__(name, help_text)
+        self.read = read
+        self.value = 0
+
+    def inc(self):
+        self.value += 1
+
+    def dec(self):
+        self.value -= 1
+
+    def render(self) -> List[str]:
+        value = self.read() if self.read is not None else self.value
+        return self.header() + [f"{self.name} {value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *label_values: str) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for label_values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "ironlady_request_seconds", "Total time to answer a chat request", ("endpoint",)
+))
+LLM_SECONDS = registry.register(Histogram(
+    "ironlady_llm_seconds", "Upstream LLM completion latency", ("kind",)
+))
+FIRST_TOKEN_SECONDS = registry.register(Histogram(
+    "ironlady_time_to_first_token_seconds", "Time from LLM call to first streamed token"
+))
+FALLBACK_SECONDS = registry.register(Histogram(
+    "ironlady_fallback_seconds", "Time spent building keyword fallback responses"
+))
+KNOWLEDGE_LOOKUP_SECONDS = registry.register(Histogram(
+    "ironlady_knowledge_lookup_seconds", "Knowledge base lookup time", ("stage",)
+))
+PROMPT_TOKENS = registry.register(Counter(
+    "ironlady_prompt_tokens_total", "Prompt tokens reported by the provider"
+))
+COMPLETION_TOKENS = registry.register(Counter(
+    "ironlady_completion_tokens_total", "Completion tokens reported by the provider"
+))
+UPSTREAM_ERRORS = registry.register(Counter(
+    "ironlady_upstream_errors_total", "Upstream LLM errors by exception type", ("error",)
+))
+FALLBACKS = registry.register(Counter(
+    "ironlady_fallback_total", "Requests answered with keyword fallback responses"
+))
+ANSWERS = registry.register(Counter(
+    "ironlady_answers_total", "Chat answers by source", ("source",)
+))
+ROUTED_REQUESTS = registry.register(Counter(
+    "ironlady_routed_requests_total", "LLM requests by router tier", ("tier",)
+))
+LOAD_SHED = registry.register(Counter(
+    "ironlady_load_shed_total", "Requests answered without the LLM because it was saturated"
+))
+RATE_LIMITED = registry.register(Counter(
+    "ironlady_rate_limited_total", "Requests rejected by the per-client rate limit", ("endpoint",)
+))
+CIRCUIT_TRANSITIONS = registry.register(Counter(
+    "ironlady_circuit_transitions_total", "Circuit breaker state changes", ("model", "state")
+))
+HEDGED_REQUESTS = registry.register(Counter(
+    "ironlady_hedged_requests_total", "Calls sent to the secondary model", ("reason",)
+))
+IN_FLIGHT_REQUESTS = registry.register(Gauge(
+    "ironlady_in_flight_requests", "Chat requests currently being processed"
+))
+LOOP_LAG_SECONDS = registry.register(Histogram(
+    "ironlady_event_loop_lag_seconds", "How late periodic event loop wake-ups run"
+))
+
+
+class LoopLagMonitor:
+    """Samples event loop lag: how much later than scheduled a short sleep wakes up"""
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", 0.1))
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _probe_forever(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
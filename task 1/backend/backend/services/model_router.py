@@ -0,0 +1,113 @@
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from services import metrics
+from services.history import SUMMARY_ROLE
+from services.intent import IntentEngine, GENERAL
+
+GREETING = "greeting"
+SIMPLE = "simple"
+COMPLEX = "complex"
+
+# Small talk that needs a friendly line, not a considered answer
+_GREETING = re.compile(
+    r"^\W*(?:hi|hii+|hey|hello|hola|namaste|good (?:morning|afternoon|evening)|thanks?|thank you|"
+    r"ty|ok(?:ay)?|cool|great|bye|goodbye|see you)\b[\s\w!.,']{0,20}$"
+)
+# Requests for personal guidance always go to the strongest model
+_ADVICE = re.compile(
+    r"\b(?:should i|how (?:can|do|should) i|what would you|advi[cs]e|recommend|career|strateg\w*|"
+    r"c-?suite|ceo|board|promot\w*|negotiat\w*|salary|transition|struggl\w*|confus\w*|my (?:boss|team|manager))\b"
+)
+
+
+class Route(NamedTuple):
+    tier: str
+    model: str
+    max_tokens: int
+    temperature: float
+    reason: str
+
+
+class ModelRouter:
+    """
+    Picks a model tier and output budget per request, locally and in microseconds.
+
+    Greetings and short factual questions (programs, enrollment, pricing,
+    schedule) early in a conversation go to the fast model with a smaller
+    max_tokens; requests for advice, long questions and deep conversations go
+    to the primary model with the full budget. Decisions are counted per tier
+    in /metrics and can be logged one line per request.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        fast_model: Optional[str],
+        intent_engine: IntentEngine,
+        enabled: bool = None
+    ):
+        self.model = model
+        self.fast_model = fast_model or model
+        self.intent_engine = intent_engine
+        if enabled is None:
+            enabled = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self.log = os.getenv("ROUTER_LOG", "false").lower() == "true"
+        self.simple_max_words = int(os.getenv("ROUTER_SIMPLE_MAX_WORDS", 25))
+        self.fast_max_turns = int(os.getenv("ROUTER_FAST_MAX_TURNS", 3))
+        self.budgets = {
+            GREETING: int(os.getenv("ROUTER_GREETING_MAX_TOKENS", 150)),
+            SIMPLE: int(os.getenv("ROUTER_SIMPLE_MAX_TOKENS", 350)),
+            COMPLEX: int(os.getenv("ROUTER_COMPLEX_MAX_TOKENS", 500)),
+        }
+        self.routed = {GREETING: 0, SIMPLE: 0, COMPLEX: 0}
+
+    def route(self, conversation: List[Dict]) -> Route:
+        """Route the latest user message of a conversation"""
+        route = self._classify(conversation) if self.enabled else Route(
+            COMPLEX, self.model, self.budgets[COMPLEX], 0.7, "routing disabled"
+        )
+        self.routed[route.tier] += 1
+        metrics.ROUTED_REQUESTS.inc(route.tier)
+        if self.log:
+            print(f"🧭 {route.tier} -> {route.model} (max_tokens {route.max_tokens}): {route.reason}")
+        return route
+
+    def _classify(self, conversation: List[Dict]) -> Route:
+        message = next(
+            (m["content"] for m in reversed(conversation) if m["role"] == "user"), ""
+        ).lower()
+        words = len(message.split())
+        # A summary stands in for several earlier turns
+        turns = sum(
+            1 if m["role"] == "user" else self.fast_max_turns if m["role"] == SUMMARY_ROLE else 0
+            for m in conversation
+        )
+
+        if _GREETING.match(message):
+            return Route(GREETING, self.fast_model, self.budgets[GREETING], 0.7, "greeting")
+        if _ADVICE.search(message):
+            return self._complex("asks for advice")
+        if words > self.simple_max_words:
+            return self._complex(f"{words} words")
+        if turns > self.fast_max_turns:
+            return self._complex(f"turn {turns}")
+
+        intent = self.intent_engine.classify(message)
+        if intent == GENERAL:
+            return self._complex("open question")
+        return Route(SIMPLE, self.fast_model, self.budgets[SIMPLE], 0.4, f"{intent} question")
+
+    def _complex(self, reason: str) -> Route:
+        return Route(COMPLEX, self.model, self.budgets[COMPLEX], 0.7, reason)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "fast_model": self.fast_model,
+            "budgets": self.budgets,
+            "routed": self.routed,
+        }
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import hashlib
+import os
+import time
+from typing import Dict, Optional
+
+# Provider errors that mean the referenced cache is gone or unusable, e.g.
+# "404 CachedContent not found (or permission denied)"
+_CACHE_ERROR_SUBJECTS = ("cachedcontent", "cached content", "cached_content")
+_CACHE_ERROR_REASONS = ("not found", "not_found", "expired", "invalid", "does not exist", "permission denied")
+
+
+def is_cache_error(error: Exception) -> bool:
+    """True when a provider error says the cached content is missing or invalid"""
+    message = str(error).lower()
+    return any(s in message for s in _CACHE_ERROR_SUBJECTS) and any(r in message for r in _CACHE_ERROR_REASONS)
+
+
+class PromptCache:
+    """
+    Vertex AI cached content for the constant core system prompt.
+
+    The prompt is uploaded once at startup (and again whenever it changes or
+    nears expiry) and each request only references the cache handle, so
+    Vertex does not re-process the prefix. When caching is disabled or the
+    provider rejects it (e.g. the prompt is below the model's minimum cache
+    size) requests fall back to sending the full system prompt; Gemini's
+    implicit prefix caching still applies because the core prompt is always
+    the first thing sent.
+    """
+
+    def __init__(self, model: str, ttl_seconds: float = None, enabled: bool = None):
+        self.model = model
+        self.ttl_seconds = ttl_seconds or float(os.getenv("PROMPT_CACHE_TTL_SECONDS", 3600))
+        if enabled is None:
+            enabled = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+
+        self.handle: Optional[str] = None
+        self.prompt_hash: Optional[str] = None
+        self.expires_at = 0.0
+        self.last_error: Optional[str] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._recreator: Optional[asyncio.Task] = None
+        self._get_prompt = None
+
+    def request_kwargs(self) -> Dict:
+        """Extra completion arguments referencing the cache, if one is live"""
+        if self.handle is None or time.time() >= self.expires_at:
+            return {}
+        return {"cached_content": self.handle}
+
+    async def refresh(self, system_prompt: str):
+        """Create a cache for this prompt unless an identical one is still live"""
+        if not self.enabled:
+            return
+
+        prompt_hash = hashlib.sha256(system_prompt.encode()).hexdigest()[:12]
+        # Renew once 80% of the TTL has passed so requests never hit an expired handle
+        fresh_until = self.expires_at - self.ttl_seconds * 0.2
+        if prompt_hash == self.prompt_hash and self.handle and time.time() < fresh_until:
+            return
+
+        try:
+            handle = await asyncio.to_thread(self._create, system_prompt)
+        except Exception as e:
+            self.last_error = str(e)
+            self.invalidate()
+            print(f"⚠️  Prompt cache unavailable, sending full system prompt: {str(e)}")
+            return
+
+        self.handle = handle
+        self.prompt_hash = prompt_hash
+        self.expires_at = time.time() + self.ttl_seconds
+        self.last_error = None
+        print(f"🗄️  Prompt cache ready: {handle}")
+
+    def _create(self, system_prompt: str) -> str:
+        # Imported lazily: the Vertex SDK is large and only needed here
+        import vertexai
+        from vertexai.preview import caching
+
+        vertexai.init(
+            project=os.getenv("GCP_PROJECT_ID") or os.getenv("VERTEXAI_PROJECT"),
+            location=os.getenv("GCP_REGION") or os.getenv("VERTEXAI_LOCATION", "us-central1")
+        )
+        cached = caching.CachedContent.create(
+            model_name=self.model,
+            system_instruction=system_prompt,
+            ttl=datetime.timedelta(seconds=self.ttl_seconds),
+            display_name="iron-lady-system-prompt"
+        )
+        return cached.name
+
+    def invalidate(self):
+        """Stop referencing the current handle, e.g. after the provider rejected it"""
+        self.handle = None
+        self.prompt_hash = None
+        self.expires_at = 0.0
+
+    def reject(self, handle: str, error: Exception) -> bool:
+        """
+        Drop the handle if the provider says it no longer has that cache and
+        recreate it right away; other errors (timeouts, overload) keep it
+        """
+        if handle != self.handle or not is_cache_error(error):
+            return False
+        self.last_error = str(error)
+        self.invalidate()
+        print(f"⚠️  Prompt cache rejected by provider, recreating: {str(error)}")
+        if self._get_prompt is not None and (self._recreator is None or self._recreator.done()):
+            self._recreator = asyncio.create_task(self.refresh(self._get_prompt()))
+        return True
+
+    async def _refresh_forever(self, get_prompt):
+        while True:
+            await self.refresh(get_prompt())
+            await asyncio.sleep(max(self.ttl_seconds * 0.2, 30))
+
+    def start(self, get_prompt):
+        """Create the cache in the background and keep it renewed"""
+        if self.enabled and self._refresher is None:
+            self._get_prompt = get_prompt
+            self._refresher = asyncio.create_task(self._refresh_forever(get_prompt))
+
+    async def stop(self):
+        for task in (self._refresher, self._recreator):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = self._recreator = None
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "active": bool(self.request_kwargs()),
+            "handle": self.handle,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,221 @@
+import os
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Words that carry no meaning of their own in a question; anything else
+# (including negations) has to agree for two questions to share an answer
+STOP_WORDS = frozenset(
+    "a about am an any are as at be can could do does for have how i in is it me my "
+    "of on or please so tell that the there this to us was we what when where which "
+    "who will with would you your".split()
+)
+NEGATIONS = frozenset("no not never none nor without cannot cant dont doesnt isnt arent t".split())
+
+# MinHash / LSH parameters: 30 hash functions split into 10 bands of 3 rows,
+# giving ~98% recall at Jaccard 0.7 and ~24% candidate rate at 0.3
+NUM_PERMUTATIONS = 30
+BAND_ROWS = 3
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _NON_WORD.sub(" ", message.lower()).strip()
+
+
+def shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    """Character n-grams of a normalized message"""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return frozenset([padded])
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def content_tokens(text: str) -> FrozenSet[str]:
+    """Words of a normalized message that change its meaning"""
+    return frozenset(word for word in text.split() if word not in STOP_WORDS)
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """Whether b is a at most one insertion, deletion or substitution away"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return a[i + 1:] == b[i + 1:] if len(a) == len(b) else a[i:] == b[i + 1:]
+    return True
+
+
+def same_question(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """
+    Token-level check for a near-duplicate: every content word of one question
+    must appear in the other, allowing only a one-letter typo or plural in
+    words of four letters or more. A negation never pairs with anything, so
+    "is it online" and "is it not online" stay different questions.
+    """
+    for words, others in ((a - b, b - a), (b - a, a - b)):
+        for word in words:
+            if word in NEGATIONS or len(word) < 4:
+                return False
+            if not any(len(other) >= 4 and _one_edit_apart(word, other) for other in others):
+                return False
+    return True
+
+
+def minhash(shingle_set: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHash signature approximating Jaccard similarity between shingle sets"""
+    hashes = [zlib.crc32(s.encode()) for s in shingle_set]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _CachedAnswer:
+    __slots__ = ("answer", "version", "created_at", "shingles", "tokens", "bands")
+
+    def __init__(
+        self, answer: str, version: str, shingle_set: FrozenSet[str], tokens: FrozenSet[str], bands: list
+    ):
+        self.answer = answer
+        self.version = version
+        self.created_at = time.monotonic()
+        self.shingles = shingle_set
+        self.tokens = tokens
+        self.bands = bands
+
+
+class AnswerCache:
+    """
+    Cache of first-turn answers keyed by normalized message.
+
+    Exact matches are a single dict lookup. Near-duplicates ("what programs
+    do you offer" vs "which programs do you offer?") are found through MinHash
+    LSH buckets, confirmed with shingled Jaccard similarity and then checked
+    word by word, so questions that differ only by a negation or a content
+    word ("as a man" / "as a woman") never share an answer. Entries are
+    bounded in number, expire after a TTL and only match the knowledge base
+    version they were generated from.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        similarity: float = None
+    ):
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 2048))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 6 * 3600))
+        self.similarity = similarity or float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.7))
+
+        self._entries: "OrderedDict[str, _CachedAnswer]" = OrderedDict()
+        self._buckets: Dict[Tuple, set] = {}
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, message: str, version: str) -> Optional[str]:
+        """Return a cached answer for this message or a near-duplicate"""
+        key = normalize_message(message)
+        entry = self._live_entry(key, version)
+        if entry is not None:
+            self.hits += 1
+            return entry.answer
+
+        shingle_set = shingles(key)
+        tokens = content_tokens(key)
+        best_key, best_score = None, self.similarity
+        stale = set()
+        for band in self._bands(minhash(shingle_set)):
+            for candidate in self._buckets.get(band, ()):
+                candidate_entry = self._entries[candidate]
+                # Skipped before scoring, so an expired best match cannot hide a fresh one
+                if self._is_stale(candidate_entry, version):
+                    stale.add(candidate)
+                    continue
+                score = jaccard(shingle_set, candidate_entry.shingles)
+                if score >= best_score and same_question(tokens, candidate_entry.tokens):
+                    best_key, best_score = candidate, score
+        for candidate in stale:
+            self._remove(candidate)
+
+        if best_key is not None:
+            entry = self._live_entry(best_key, version)
+            if entry is not None:
+                self.near_hits += 1
+                return entry.answer
+
+        self.misses += 1
+        return None
+
+    def put(self, message: str, version: str, answer: str):
+        key = normalize_message(message)
+        if not key:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        shingle_set = shingles(key)
+        bands = self._bands(minhash(shingle_set))
+        self._entries[key] = _CachedAnswer(answer, version, shingle_set, content_tokens(key), bands)
+        for band in bands:
+            self._buckets.setdefault(band, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self):
+        """Drop every cached answer, e.g. after a knowledge base change"""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _live_entry(self, key: str, version: str) -> Optional[_CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._is_stale(entry, version):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _is_stale(self, entry: _CachedAnswer, version: str) -> bool:
+        return entry.version != version or time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        for band in entry.bands:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]) -> list:
+        return [
+            (i, signature[i:i + BAND_ROWS]) for i in range(0, NUM_PERMUTATIONS, BAND_ROWS)
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,143 @@
+import heapq
+import math
+import os
+import re
+from typing import Dict, List
+
+_TOKEN = re.compile(r"[a-z0-9+]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "our so that the this to what when where which who will with you your".split()
+)
+
+
+# Suffixes folded by the light stemmer, longest first
+_SUFFIXES = ("ments", "ment", "ings", "ing", "ed", "es", "s")
+
+
+def stem(token: str) -> str:
+    """Very light suffix stripping so enroll/enrollment/enrolling share a term"""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            if suffix == "s" and token.endswith("ss"):
+                return token
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase stemmed word tokens with stopwords removed"""
+    return [stem(token) for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class Chunk:
+    """A retrievable piece of the knowledge base"""
+
+    __slots__ = ("kind", "title", "text")
+
+    def __init__(self, kind: str, title: str, text: str):
+        self.kind = kind
+        self.title = title
+        self.text = text
+
+
+class KnowledgeIndex:
+    """
+    In-memory BM25 inverted index over programs, FAQs and enrollment info,
+    used to put only the most relevant chunks into each prompt
+    """
+
+    def __init__(self, data: Dict, top_k: int = None, k1: float = 1.5, b: float = 0.75):
+        self.top_k = top_k or int(os.getenv("RETRIEVAL_TOP_K", 4))
+        self.k1 = k1
+        self.b = b
+
+        self.chunks = self._build_chunks(data)
+        self._postings: Dict[str, List[tuple]] = {}
+        self._lengths: List[int] = []
+
+        for doc_id, chunk in enumerate(self.chunks):
+            tokens = tokenize(f"{chunk.title} {chunk.text}")
+            self._lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((doc_id, tf))
+
+        total = len(self.chunks)
+        self._avg_length = sum(self._lengths) / total if total else 0.0
+        self._idf = {
+            token: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self._postings.items()
+        }
+
+    @staticmethod
+    def _build_chunks(data: Dict) -> List[Chunk]:
+        """Split raw knowledge base data (programs, faqs, enrollment_info) into chunks"""
+        chunks = []
+
+        for program in data["programs"]:
+            chunks.append(Chunk(
+                "program",
+                program["name"],
+                f"Duration: {program['duration']}\n"
+                f"Price: {program['price']}\n"
+                f"Format: {program['format']}\n"
+                f"Description: {program['description']}\n"
+                f"Highlights: {'; '.join(program['highlights'])}\n"
+                f"For: {program['target_audience']}\n"
+                f"Prerequisites: {program['prerequisites']}\n"
+                f"Outcomes: {program['key_outcomes']}"
+            ))
+
+        for faq in data["faqs"]:
+            chunks.append(Chunk("faq", faq["question"], faq["answer"]))
+
+        info = data["enrollment_info"]
+        chunks.append(Chunk(
+            "enrollment",
+            "Enrollment process",
+            "\n".join(f"{i}. {step}" for i, step in enumerate(info["steps"], 1))
+            + f"\nStart dates: {info['start_dates']}"
+        ))
+        chunks.append(Chunk(
+            "enrollment",
+            "Enrollment requirements and who should join",
+            "Requirements: " + "; ".join(info["requirements"])
+            + "\nWho should join: " + "; ".join(info["who_should_join"])
+        ))
+        chunks.append(Chunk(
+            "enrollment",
+            "Payment options, fees and investment",
+            "; ".join(info["payment_options"])
+        ))
+        contact = info["contact"]
+        chunks.append(Chunk(
+            "contact",
+            "Contact and community",
+            f"Phone: {contact['phone']}\nWebsite: {contact['website']}\n"
+            f"Mission: {contact['mission']}\nCommunity: {contact['community_size']}"
+        ))
+
+        return chunks
+
+    def search(self, query: str, top_k: int = None) -> List[Chunk]:
+        """Return the top-k chunks ranked by BM25"""
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf[token]
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(top_k or self.top_k, scores.items(), key=lambda item: item[1])
+        return [self.chunks[doc_id] for doc_id, _ in best]
+
+    @staticmethod
+    def format_context(chunks: List[Chunk]) -> str:
+        return "\n\n".join(f"• {chunk.title}\n{chunk.text}" for chunk in chunks)
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class _Broadcast:
+    """Tokens of one shared stream, replayed in full to every subscriber"""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def pump(self, tokens: AsyncIterator[str]):
+        try:
+            async for token in tokens:
+                self.tokens.append(token)
+                self._notify()
+        except asyncio.CancelledError as e:
+            self.error = e
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    async def subscribe(self, timeout: Optional[float]) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            while index < len(self.tokens):
+                yield self.tokens[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one.
+
+    The first caller for a key (the leader) starts the work as a task; callers
+    arriving while it is in flight (followers) wait on the same result with
+    their own timeout instead of starting another upstream call. The shared
+    task is shielded, so a follower or leader giving up never cancels it for
+    the others.
+
+    Streams coalesce the same way: every caller receives all tokens of the
+    shared stream, including those produced before it joined, and followers
+    time out if no new token arrives within follower_timeout.
+    """
+
+    def __init__(self, follower_timeout: float = None):
+        self.follower_timeout = follower_timeout or float(
+            os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", os.getenv("LLM_TIMEOUT_SECONDS", 30))
+        )
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.follower_timeouts = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]):
+        """Run factory() once per key at a time and share its result"""
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), timeout=self.follower_timeout)
+            except asyncio.TimeoutError:
+                self.follower_timeouts += 1
+                raise
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def stream(
+        self, key: Hashable, factory: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Run the token stream factory() once per key at a time and fan it out"""
+        broadcast = self._streams.get(key)
+        timeout = None
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            task = asyncio.ensure_future(broadcast.pump(factory()))
+            task.add_done_callback(lambda _: self._streams.pop(key, None))
+        else:
+            self.coalesced += 1
+            timeout = self.follower_timeout
+
+        try:
+            async for token in broadcast.subscribe(timeout):
+                yield token
+        except asyncio.TimeoutError:
+            self.follower_timeouts += 1
+            raise
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._in_flight) + len(self._streams),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "follower_timeouts": self.follower_timeouts,
+        }
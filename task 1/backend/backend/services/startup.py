@@ -0,0 +1,44 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupReport:
+    """
+    Wall-clock breakdown of process startup.
+
+    Created as the first thing main.py imports; each mark() records the time
+    since the previous mark under a phase name (imports, knowledge base load,
+    service construction, background task start). Work that finishes after
+    the app is serving, such as importing the LLM provider stack, is recorded
+    separately so time-to-ready and time-to-warm can be tracked per release.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.background: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def ready(self):
+        """Mark the end of blocking startup and log the breakdown"""
+        self.mark("lifespan_start")
+        self.ready_seconds = time.perf_counter() - self.started
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases)
+        print(f"🚀 Ready in {self.ready_seconds * 1000:.0f}ms ({breakdown})")
+
+    def record_background(self, task: str, seconds: float):
+        self.background[task] = seconds
+        print(f"🔥 {task} finished in {seconds * 1000:.0f}ms")
+
+    def stats(self) -> Dict:
+        return {
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases},
+            "ready_ms": round(self.ready_seconds * 1000, 1) if self.ready_seconds is not None else None,
+            "background_ms": {name: round(seconds * 1000, 1) for name, seconds in self.background.items()},
+        }
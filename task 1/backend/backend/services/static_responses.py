@@ -0,0 +1,81 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class EncodedResponse(NamedTuple):
+    """A JSON body with its ETag and pre-compressed variants"""
+
+    etag: str
+    identity: bytes
+    gzip: bytes
+    br: Optional[bytes]
+
+
+def _accepts(accept_encoding: str, encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+class StaticResponses:
+    """
+    Pre-serialized responses for endpoints whose content only changes with the
+    knowledge base. Bodies, ETags and gzip/brotli variants are computed once per
+    version, and requests are answered with 304 when the client already has it.
+    """
+
+    def __init__(self, max_age: int = None):
+        self.max_age = max_age or int(os.getenv("STATIC_MAX_AGE_SECONDS", 300))
+        self._responses: Dict[str, EncodedResponse] = {}
+
+    def set(self, name: str, body: bytes):
+        """Encode and store a response body under a name"""
+        self._responses[name] = EncodedResponse(
+            etag=f'"{hashlib.sha256(body).hexdigest()[:16]}"',
+            identity=body,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            br=brotli.compress(body, quality=11) if brotli is not None else None
+        )
+
+    def respond(self, name: str, request: Request) -> Response:
+        encoded = self._responses[name]
+        headers = {
+            "ETag": encoded.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, encoded.etag):
+            return Response(status_code=304, headers=headers)
+
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if encoded.br is not None and _accepts(accept_encoding, "br"):
+            body = encoded.br
+            headers["Content-Encoding"] = "br"
+        elif _accepts(accept_encoding, "gzip"):
+            body = encoded.gzip
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = encoded.identity
+
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+# Per-program questions generated from KnowledgeBase.programs
+PROGRAM_QUESTION_TEMPLATES = [
+    "Tell me about the {name}",
+    "Who is the {name} for?",
+]
+
+
+class AnswerWarmer:
+    """
+    Background warm-up of the answer cache.
+
+    On startup and then every interval seconds, generates answers for the
+    quick questions and per-program questions so the first click on any of
+    them is a cache read. Runs alongside normal traffic with a small
+    concurrency limit and never delays readiness.
+    """
+
+    def __init__(
+        self,
+        chatbot_service,
+        questions: Callable[[], List[str]],
+        interval: float = None,
+        concurrency: int = None
+    ):
+        self.chatbot_service = chatbot_service
+        self.questions = questions
+        self.interval = interval or float(os.getenv("WARMUP_INTERVAL_SECONDS", 3600))
+        self.concurrency = concurrency or int(os.getenv("WARMUP_CONCURRENCY", 2))
+        self.enabled = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+        self.state = "pending"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_finished: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def all_questions(self) -> List[str]:
+        """Quick questions plus per-program questions, without duplicates"""
+        questions = list(self.questions())
+        for program in self.chatbot_service.knowledge_base.programs:
+            questions.extend(
+                template.format(name=program["name"]) for template in PROGRAM_QUESTION_TEMPLATES
+            )
+        return list(dict.fromkeys(questions))
+
+    async def run_once(self):
+        questions = self.all_questions()
+        self.state = "running"
+        self.total = len(questions)
+        self.completed = 0
+        self.failed = 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(question: str):
+            async with semaphore:
+                try:
+                    await self.chatbot_service.warm_answer(question)
+                    self.completed += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Warm-up error for {question!r}: {str(e)}")
+
+        await asyncio.gather(*(warm(question) for question in questions))
+        self.state = "done"
+        self.last_finished = time.time()
+        print(f"🔥 Warm-up finished: {self.completed}/{self.total} answers cached")
+
+    async def _run_forever(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start warming in the background; skipped when there is no LLM to warm from"""
+        if not self.enabled or not self.chatbot_service.client_available:
+            self.state = "disabled"
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+            self.chatbot_service.knowledge_base.add_listener(self._on_knowledge_base_change)
+
+    def _on_knowledge_base_change(self, snapshot):
+        """Re-warm right away, since answers for the old version no longer match"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "last_finished": self.last_finished,
+        }
@@ -0,0 +1,73 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Deterministic, offline service configuration; set before anything imports main
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+os.environ["CONVERSATION_BACKEND"] = "memory"
+os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+os.environ.pop("LLM_API_BASE", None)
+os.environ.pop("LLM_TRANSPORT", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeLLM:
+    """
+    Stand-in for litellm.acompletion.
+
+    reply(model, messages) returns the answer text (or raises); streamed
+    answers are split on spaces and, when stream_options asks for usage,
+    end with a usage-only chunk like providers send.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.reply = lambda model, messages: "fake answer"
+        self.delay = 0.0
+        self.usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=None)
+
+    async def __call__(self, model, messages, stream=False, **kwargs):
+        import asyncio
+
+        self.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        text = self.reply(model, messages)
+        if not stream:
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=self.usage
+            )
+
+        async def chunks():
+            for word in text.split(" "):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
+            if (kwargs.get("stream_options") or {}).get("include_usage"):
+                yield SimpleNamespace(choices=[], usage=self.usage)
+
+        return chunks()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    import services.llm_client as llm_client
+
+    fake = FakeLLM()
+    monkeypatch.setattr(llm_client, "acompletion", fake)
+    return fake
+
+
+@pytest.fixture
+def app_client(fake_llm, monkeypatch):
+    """TestClient for main.app with the LLM replaced by fake_llm"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(main.chatbot_service, "client_available", True)
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,112 @@
+import pytest
+
+from services.admission import AdmissionController, LoadShedError, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import services.admission as admission
+
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_limiter_allows_burst_then_refills(clock):
+    limiter = RateLimiter(per_minute=60, burst=3)
+    assert [limiter.allow("a")[0] for _ in range(4)] == [True, True, True, False]
+
+    allowed, retry_after = limiter.allow("a")
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+    clock[0] += 1
+    assert limiter.allow("a")[0]
+    # Other clients have their own bucket
+    assert limiter.allow("b")[0]
+
+
+def test_rate_limiter_memory_is_bounded(clock):
+    limiter = RateLimiter(per_minute=60, burst=1, max_clients=100)
+    for client in range(1000):
+        limiter.allow(client)
+    assert limiter.stats()["clients"] == 100
+    # Evicted clients start over with a full bucket
+    assert limiter.allow(0)[0]
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(per_minute=0, burst=1)
+    assert all(limiter.allow("a")[0] for _ in range(100))
+    assert limiter.stats()["clients"] == 0
+
+
+def test_admission_sheds_past_the_limit():
+    controller = AdmissionController(max_concurrency=2, max_queue=1)
+    with controller.admit(), controller.admit(), controller.admit():
+        with pytest.raises(LoadShedError):
+            with controller.admit():
+                pass
+        assert controller.in_flight == 3
+    assert controller.in_flight == 0
+    with controller.admit():
+        pass
+    assert controller.stats()["shed"] == 1
+    assert controller.stats()["admitted"] == 4
+
+
+def test_batch_counts_as_one_request(app_client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(per_minute=60, burst=2))
+    # Far more messages than the burst
+    batch = {"messages": [{"message": f"question {i}"} for i in range(25)]}
+    assert app_client.post("/api/chat/batch", json=batch).status_code == 200
+    assert app_client.post("/api/chat/batch", json=batch).status_code == 200
+
+    response = app_client.post("/api/chat/batch", json=batch)
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+
+
+def test_oversized_batch_is_rejected_before_rate_limiting(app_client, monkeypatch):
+    import main
+
+    limiter = RateLimiter(per_minute=60, burst=1)
+    monkeypatch.setattr(main, "rate_limiter", limiter)
+    monkeypatch.setattr(main.batch_runner, "max_items", 3)
+    too_big = {"messages": [{"message": f"question {i}"} for i in range(4)]}
+    assert app_client.post("/api/chat/batch", json=too_big).status_code == 413
+    # The rejected batch did not spend the client's token
+    assert app_client.post("/api/chat/batch", json={"messages": [{"message": "hi"}]}).status_code == 200
+
+
+def test_chat_is_rate_limited(app_client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(per_minute=60, burst=2))
+    statuses = [
+        app_client.post("/api/chat", json={"message": "What programs do you offer?"}).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_shed_requests_skip_retrieval_and_routing(app_client, fake_llm, monkeypatch):
+    import main
+
+    service = main.chatbot_service
+    monkeypatch.setattr(service, "admission", AdmissionController(max_concurrency=1, max_queue=0))
+    requests_before = service.token_usage["requests"]
+    routed_before = dict(service.router.routed)
+
+    with service.admission.admit():
+        response = app_client.post("/api/chat", json={"message": "Tell me something about mentoring circles"})
+        streamed = app_client.post("/api/chat/stream", json={"message": "And about peer coaching groups?"})
+
+    assert response.json()["degraded"] is True
+    assert '"degraded": true' in streamed.text
+    assert fake_llm.calls == []
+    assert service.token_usage["requests"] == requests_before
+    assert service.router.routed == routed_before
+    assert service.admission.stats()["shed"] == 2
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from services.batch import BatchRunner
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+@pytest.mark.parametrize("max_parallel", [0, -1])
+def test_invalid_max_parallel_is_rejected(app_client, max_parallel):
+    batch = {"messages": [{"message": "hi"}], "max_parallel": max_parallel}
+    response = app_client.post("/api/chat/batch", json=batch)
+    assert response.status_code == 422
+
+
+def test_answers_every_message_and_keeps_conversation_order(app_client, fake_llm):
+    fake_llm.reply = lambda model, messages: f"answer to {messages[-1]['content']}"
+    conversation_id = f"script-{uuid.uuid4()}"
+    batch = {
+        "messages": [
+            {"message": f"first turn {uuid.uuid4()}", "conversation_id": conversation_id},
+            {"message": "   "},
+            {"message": f"second turn {uuid.uuid4()}", "conversation_id": conversation_id},
+        ],
+        "max_parallel": 2,
+    }
+    response = app_client.post("/api/chat/batch", json=batch)
+    assert response.status_code == 200
+
+    results = {result["index"]: result for result in _lines(response)}
+    assert sorted(results) == [0, 1, 2]
+    assert results[1]["error"] == "Message cannot be empty"
+    assert results[2]["conversation_id"] == conversation_id
+    # The second turn was answered with the first one in its history
+    second = next(c for c in fake_llm.calls if c["messages"][-1]["content"].startswith("second turn"))
+    assert any(m["content"].startswith("answer to first turn") for m in second["messages"])
+
+
+def test_parallelism_is_capped_by_the_server():
+    runner = BatchRunner(max_parallel=2)
+    running = peak = 0
+
+    async def process(message, conversation_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"message": message}
+
+    async def scenario():
+        items = [{"message": f"m{i}"} for i in range(6)]
+        return [result async for result in runner.run(process, items, parallel=10)]
+
+    results = asyncio.run(scenario())
+    assert sorted(r["index"] for r in results) == list(range(6))
+    assert peak == 2
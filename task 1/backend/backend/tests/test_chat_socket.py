@@ -0,0 +1,114 @@
+import time
+import uuid
+
+from services.conversation_backend import SQLiteConversationBackend
+from services.conversation_store import ConversationStore
+from services.history import SUMMARY_PROMPT, SUMMARY_ROLE
+
+
+def _receive_until_done(ws):
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        frames.append(frame)
+        if frame["type"] in ("done", "error"):
+            return frames
+
+
+def test_streams_tokens_and_done_per_message(app_client, fake_llm):
+    fake_llm.reply = lambda model, messages: "answer for you"
+    with app_client.websocket_connect("/ws/chat") as ws:
+        ready = ws.receive_json()
+        assert ready["type"] == "ready"
+
+        ws.send_json({"type": "message", "message": f"tell me a story {uuid.uuid4()}", "id": 1})
+        frames = _receive_until_done(ws)
+
+    text = "".join(f["text"] for f in frames if f["type"] == "token")
+    assert text.strip() == "answer for you"
+    assert frames[-1]["type"] == "done"
+    assert frames[-1]["id"] == 1
+    assert frames[-1]["conversation_id"] == ready["conversation_id"]
+
+
+def test_ping_and_invalid_frames(app_client):
+    with app_client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "message", "message": "   ", "id": 7})
+        error = ws.receive_json()
+        assert error == {"type": "error", "id": 7, "detail": "Message cannot be empty"}
+
+
+def test_later_turns_use_the_background_summary(app_client, fake_llm, monkeypatch, tmp_path):
+    import main
+
+    service = main.chatbot_service
+    # A shared backend hands out a fresh list on every read once the cache entry ages
+    store = ConversationStore(
+        backend=SQLiteConversationBackend(str(tmp_path / "conversations.db")),
+        cache_seconds=1e-6,
+        flush_interval=0.01
+    )
+
+    async def start_store():
+        store.start()
+
+    app_client.portal.call(start_store)
+    monkeypatch.setattr(service, "conversations", store)
+    monkeypatch.setattr(service.history, "summary_trigger", 10)
+    monkeypatch.setattr(service.history, "keep_recent", 2)
+
+    def reply(model, messages):
+        if messages[0]["content"] == SUMMARY_PROMPT:
+            return "SUMMARY OF EARLIER TURNS"
+        return "a long enough answer to push the history past the summary trigger"
+
+    fake_llm.reply = reply
+    # Slower than a flush, so summaries land after the turn was written to the backend
+    fake_llm.delay = 0.05
+    conversation_id = f"ws-{uuid.uuid4()}"
+
+    with app_client.websocket_connect(f"/ws/chat?conversation_id={conversation_id}") as ws:
+        ws.receive_json()
+        for turn in range(4):
+            ws.send_json({"type": "message", "message": f"turn {turn} of my question", "id": turn})
+            _receive_until_done(ws)
+            # Give the background summary time to land before the next turn
+            deadline = time.monotonic() + 2
+            while service._summary_tasks and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # ...and to be flushed, so the next read comes from the backend
+            time.sleep(0.05)
+
+    stored = app_client.portal.call(store.get, conversation_id)
+    app_client.portal.call(store.stop)
+    assert stored[0]["role"] == SUMMARY_ROLE
+
+    summary_calls = [c for c in fake_llm.calls if c["messages"][0]["content"] == SUMMARY_PROMPT]
+    answer_calls = [c for c in fake_llm.calls if c["messages"][0]["content"] != SUMMARY_PROMPT]
+    # The turns after the first summary are answered with it in the prompt
+    assert any("SUMMARY OF EARLIER TURNS" in c["messages"][0]["content"] for c in answer_calls[2:])
+    # Each summary folds new turns into the previous one instead of starting over
+    later = [c["messages"][1]["content"] for c in summary_calls[1:]]
+    assert all(text.startswith("EARLIER SUMMARY: SUMMARY OF EARLIER TURNS") for text in later)
+
+
+def test_rejected_frames_do_not_spend_the_rate_limit(app_client, fake_llm, monkeypatch):
+    import main
+    from services.admission import RateLimiter
+
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(per_minute=1, burst=1))
+    with app_client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()
+        for index in range(3):
+            ws.send_json({"type": "message", "message": "  ", "id": index})
+            assert ws.receive_json()["detail"] == "Message cannot be empty"
+
+        ws.send_json({"type": "message", "message": f"a real question {uuid.uuid4()}", "id": 3})
+        assert _receive_until_done(ws)[-1]["type"] == "done"
+        ws.send_json({"type": "message", "message": "one more", "id": 4})
+        assert ws.receive_json()["detail"] == "Too many requests"
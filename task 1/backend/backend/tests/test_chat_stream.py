@@ -0,0 +1,49 @@
+import json
+import uuid
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_streams_tokens_then_done(app_client, fake_llm):
+    fake_llm.reply = lambda model, messages: "a streamed answer"
+    response = app_client.post("/api/chat/stream", json={"message": f"tell me more {uuid.uuid4()}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response.text)
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert text.strip() == "a streamed answer"
+    name, done = events[-1]
+    assert name == "done"
+    assert done["degraded"] is False
+
+
+def test_history_is_committed_after_the_stream(app_client, fake_llm):
+    conversation_id = f"stream-{uuid.uuid4()}"
+    app_client.post("/api/chat/stream", json={"message": "first question", "conversation_id": conversation_id})
+    app_client.post("/api/chat/stream", json={"message": "second question", "conversation_id": conversation_id})
+
+    contents = [m["content"] for m in fake_llm.calls[-1]["messages"]]
+    assert "first question" in contents
+    assert "fake answer " in contents
+
+
+def test_upstream_failure_streams_a_degraded_answer(app_client, fake_llm):
+    def reply(model, messages):
+        raise RuntimeError("upstream down")
+
+    fake_llm.reply = reply
+    response = app_client.post("/api/chat/stream", json={"message": f"what now {uuid.uuid4()}"})
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["token", "done"]
+    assert events[-1][1]["degraded"] is True
+
+
+def test_empty_message_is_rejected(app_client):
+    assert app_client.post("/api/chat/stream", json={"message": "  "}).status_code == 400
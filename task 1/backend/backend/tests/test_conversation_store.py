@@ -0,0 +1,250 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.conversation_backend import ConversationBackend, SQLiteConversationBackend
+from services.conversation_store import CompactHistory, ConversationStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import services.conversation_store as conversation_store
+
+    now = [1000.0]
+    monkeypatch.setattr(conversation_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _turn(text: str):
+    return [{"role": "user", "content": text}, {"role": "assistant", "content": text.upper()}]
+
+
+def test_least_recently_used_is_evicted_first(clock):
+    store = ConversationStore(max_entries=2)
+    store["a"] = _turn("a")
+    store["b"] = _turn("b")
+    clock[0] += 1
+    # Reading "a" makes "b" the oldest
+    asyncio.run(store.get("a"))
+    store["c"] = _turn("c")
+
+    assert asyncio.run(store.get("b")) is None
+    assert asyncio.run(store.get("a")) == _turn("a")
+    assert store.evicted == 1
+
+
+def test_evicts_to_stay_within_max_bytes():
+    store = ConversationStore(max_bytes=3 * ConversationStore.estimate_size(_turn("x" * 100)))
+    for index in range(5):
+        store[f"conversation-{index}"] = _turn("x" * 100)
+
+    assert len(store) == 3
+    assert store.stats()["estimated_bytes"] <= store.max_bytes
+
+
+def test_idle_conversations_expire(clock):
+    store = ConversationStore(ttl_seconds=60)
+    store["idle"] = _turn("idle")
+    store["active"] = _turn("active")
+    clock[0] += 50
+    asyncio.run(store.get("active"))
+    clock[0] += 20
+
+    assert store.sweep() == 1
+    assert asyncio.run(store.get("idle", [])) == []
+    assert asyncio.run(store.get("active")) == _turn("active")
+
+
+def test_max_entries_bound_and_live_counts():
+    store = ConversationStore(max_entries=3)
+    for index in range(5):
+        store[f"conversation-{index}"] = _turn(f"message {index}")
+
+    stats = store.stats()
+    assert len(store) == stats["conversations"] == 3
+    assert stats["messages"] == 6
+    assert stats["evicted"] == 2
+    assert stats["estimated_bytes"] == 3 * ConversationStore.estimate_size(_turn("message 0"))
+
+    asyncio.run(store.pop("conversation-4"))
+    assert store.stats()["estimated_bytes"] == 2 * ConversationStore.estimate_size(_turn("message 0"))
+
+
+def test_background_sweeper_drops_idle_conversations():
+    store = ConversationStore(ttl_seconds=0.05, sweep_interval=0.02)
+
+    async def scenario():
+        store.start()
+        store["idle"] = _turn("idle")
+        await asyncio.sleep(0.15)
+        await store.stop()
+        return store.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["conversations"] == 0
+    assert stats["expired"] == 1
+    assert stats["estimated_bytes"] == 0
+
+
+def test_health_reports_conversation_counts(app_client):
+    conversations = app_client.get("/api/health").json()["conversations"]
+    for key in ("conversations", "messages", "estimated_bytes", "max_entries", "max_bytes", "evicted", "expired"):
+        assert key in conversations
+
+
+def test_idle_conversations_are_compacted_and_expanded_on_access(clock):
+    store = ConversationStore(compact_seconds=30, compress=True)
+    store["idle"] = _turn("idle " * 50)
+    store["active"] = _turn("active")
+    before = store.stats()["estimated_bytes"]
+    clock[0] += 40
+    asyncio.run(store.get("active"))
+
+    assert store.compact() == 1
+    assert isinstance(store._entries["idle"].messages, CompactHistory)
+    assert store.stats()["estimated_bytes"] < before
+
+    assert asyncio.run(store.get("idle")) == _turn("idle " * 50)
+    assert store.expanded == 1
+    assert store.stats()["compact"] == 0
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_compact_history_round_trips(compress):
+    messages = [{"role": "summary", "content": "She leads a team of 12"}] + _turn("naïve 🚀 question")
+    compact = CompactHistory.pack(messages, compress=compress)
+    assert len(compact) == 3
+    assert compact.expand() == messages
+    assert compact.size() < ConversationStore.estimate_size(messages)
+
+
+def test_unknown_roles_are_not_compacted():
+    messages = [{"role": "tool", "content": "result"}]
+    assert CompactHistory.pack(messages) is None
+    assert CompactHistory.pack([{"role": "user", "content": "hi", "name": "x"}]) is None
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        ConversationBackend()
+
+
+def test_sqlite_round_trip_between_stores(tmp_path):
+    path = str(tmp_path / "conversations.db")
+
+    async def scenario():
+        writer = ConversationStore(backend=SQLiteConversationBackend(path))
+        writer["shared"] = _turn("hello")
+        await writer.stop()
+
+        reader = ConversationStore(backend=SQLiteConversationBackend(path))
+        loaded = await reader.get("shared")
+        removed = await reader.pop("shared")
+        missing = await reader.get("shared")
+        await reader.stop()
+        return loaded, removed, missing
+
+    loaded, removed, missing = asyncio.run(scenario())
+    assert loaded == _turn("hello")
+    assert removed == _turn("hello")
+    assert missing is None
+
+
+def test_sqlite_reads_do_not_wait_for_a_write_in_progress(tmp_path):
+    backend = SQLiteConversationBackend(str(tmp_path / "conversations.db"))
+    backend.save_many({"shared": _turn("hello")})
+    store = ConversationStore(backend=backend)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        # The flush thread is mid-transaction
+        with backend._lock:
+            started = time.perf_counter()
+            loaded = await store.get("shared")
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0.05)
+        task.cancel()
+        return loaded, elapsed, ticks
+
+    loaded, elapsed, ticks = asyncio.run(scenario())
+    backend.close()
+    assert loaded == _turn("hello")
+    assert elapsed < 0.5
+    # The event loop kept running while the write lock was held
+    assert ticks >= 2
+
+
+def test_write_during_a_backend_read_wins(tmp_path):
+    backend = SQLiteConversationBackend(str(tmp_path / "conversations.db"))
+    backend.save_many({"shared": _turn("stale")})
+    store = ConversationStore(backend=backend)
+    release = threading.Event()
+    load = backend.load
+
+    def slow_load(conversation_id, not_before):
+        release.wait(1)
+        return load(conversation_id, not_before)
+
+    backend.load = slow_load
+
+    async def scenario():
+        read = asyncio.create_task(store.get("shared"))
+        await asyncio.sleep(0.01)
+        store["shared"] = _turn("fresh")
+        release.set()
+        return await read
+
+    assert asyncio.run(scenario()) == _turn("fresh")
+    backend.close()
+
+
+def test_reads_see_turns_written_by_another_worker(tmp_path):
+    path = str(tmp_path / "conversations.db")
+
+    async def scenario():
+        first = ConversationStore(backend=SQLiteConversationBackend(path))
+        second = ConversationStore(backend=SQLiteConversationBackend(path))
+        first["shared"] = _turn("one")
+        await first.flush()
+        # The second worker answers the next turn
+        history = await second.get("shared")
+        second["shared"] = history + _turn("two")
+        await second.flush()
+        loaded = await first.get("shared")
+        await first.stop()
+        await second.stop()
+        return loaded
+
+    assert asyncio.run(scenario()) == _turn("one") + _turn("two")
+
+
+def test_sweeper_keeps_running_when_the_purge_fails(tmp_path):
+    backend = SQLiteConversationBackend(str(tmp_path / "conversations.db"))
+    purges = []
+
+    def purge_older_than(cutoff):
+        purges.append(cutoff)
+        raise RuntimeError("database is locked")
+
+    backend.purge_older_than = purge_older_than
+    store = ConversationStore(backend=backend, sweep_interval=0.01)
+
+    async def scenario():
+        store.start()
+        await asyncio.sleep(0.1)
+        sweeper_alive = not store._tasks[0].done()
+        await store.stop()
+        return sweeper_alive
+
+    assert asyncio.run(scenario())
+    assert len(purges) >= 2
@@ -0,0 +1,54 @@
+import uuid
+
+import pytest
+
+from services.faq_matcher import FAQMatcher
+
+FAQS = [
+    {"question": "Who is Iron Lady for?", "answer": "Women professionals."},
+    {"question": "How do I join the Iron Lady community?", "answer": "Sign up online."},
+    {"question": "Are the programs available internationally?", "answer": "Yes, online."},
+]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return FAQMatcher(FAQS)
+
+
+@pytest.mark.parametrize("message, question", [
+    ("Who is Iron Lady for?", "Who is Iron Lady for?"),
+    ("who is iron lady for", "Who is Iron Lady for?"),
+    ("How do I join the Iron Lady community", "How do I join the Iron Lady community?"),
+])
+def test_rephrasings_match(matcher, message, question):
+    match = matcher.match(message)
+    assert match is not None
+    assert match.question == question
+    assert question not in match.related
+
+
+@pytest.mark.parametrize("message", [
+    "Is Iron Lady for men?",
+    "Is Iron Lady for students?",
+    "What does it cost?",
+])
+def test_different_questions_do_not_match(matcher, message):
+    assert matcher.match(message) is None
+
+
+def test_faq_answers_only_the_first_turn(app_client, fake_llm):
+    import main
+
+    faq = main.chatbot_service.faq_matcher.faqs[0]
+    first = app_client.post("/api/chat", json={"message": faq["question"]}).json()
+    assert first["message"] == faq["answer"]
+    assert fake_llm.calls == []
+
+    conversation_id = f"faq-{uuid.uuid4()}"
+    app_client.post("/api/chat", json={"message": "I lead a small team", "conversation_id": conversation_id})
+    later = app_client.post(
+        "/api/chat", json={"message": faq["question"], "conversation_id": conversation_id}
+    ).json()
+    assert later["message"] == "fake answer"
+    assert len(fake_llm.calls) == 2
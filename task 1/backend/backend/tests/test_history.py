@@ -0,0 +1,55 @@
+from services.history import SUMMARY_ROLE, HistoryWindow, estimate_tokens
+
+
+def _turns(count, text="x" * 40):
+    messages = []
+    for _ in range(count):
+        messages += [{"role": "user", "content": text}, {"role": "assistant", "content": text}]
+    return messages
+
+
+def test_window_keeps_the_newest_turns_within_budget():
+    history = HistoryWindow(token_budget=4 * estimate_tokens("x" * 40))
+    summary, messages, used = history.window(_turns(5))
+    assert summary is None
+    assert len(messages) == 4
+    assert messages[0]["role"] == "user"
+    assert used <= history.token_budget
+
+
+def test_window_always_sends_the_latest_message():
+    history = HistoryWindow(token_budget=1)
+    _, messages, _ = history.window([{"role": "user", "content": "y" * 400}])
+    assert len(messages) == 1
+
+
+def test_summary_is_split_off_and_counted():
+    history = HistoryWindow(token_budget=1000)
+    conversation = [{"role": SUMMARY_ROLE, "content": "she wants to lead"}] + _turns(1)
+    summary, messages, used = history.window(conversation)
+    assert summary == "she wants to lead"
+    assert len(messages) == 2
+    assert used == estimate_tokens(summary) + 2 * estimate_tokens("x" * 40)
+
+
+def test_summary_request_folds_in_older_turns_and_the_earlier_summary():
+    history = HistoryWindow(summary_trigger=10, keep_recent=2)
+    conversation = [{"role": SUMMARY_ROLE, "content": "EARLIER"}] + _turns(3)
+    assert history.needs_summary(conversation)
+
+    older, request = history.summary_request(conversation)
+    assert older == _turns(2)
+    assert request[1]["content"].startswith("EARLIER SUMMARY: EARLIER")
+
+
+def test_short_histories_need_no_summary():
+    history = HistoryWindow(summary_trigger=10, keep_recent=4)
+    assert not history.needs_summary(_turns(2))
+
+
+def test_trim_caps_messages_and_keeps_the_summary():
+    history = HistoryWindow(max_messages=4)
+    conversation = [{"role": SUMMARY_ROLE, "content": "S"}] + _turns(5)
+    trimmed = history.trim(conversation)
+    assert trimmed[0]["role"] == SUMMARY_ROLE
+    assert len(trimmed) == 5
@@ -0,0 +1,49 @@
+import pytest
+
+from services.intent import ENROLLMENT, GENERAL, PRICING, PROGRAMS, SCHEDULE, IntentEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return IntentEngine()
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("What programs do you offer?", PROGRAMS),
+    ("Tell me about your programme", PROGRAMS),
+    ("Which programmes are available?", PROGRAMS),
+    ("How do I enroll?", ENROLLMENT),
+    ("Can I sign up today?", ENROLLMENT),
+    ("What are the fees?", PRICING),
+    ("When does it start?", SCHEDULE),
+    ("Hello there", GENERAL),
+])
+def test_keywords(engine, message, intent):
+    assert engine.classify(message) == intent
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("tell me about the progam", PROGRAMS),
+    ("what is the shedule", SCHEDULE),
+    ("how does the aplication work", ENROLLMENT),
+    ("is there a tution discount", PRICING),
+])
+def test_typos(engine, message, intent):
+    assert engine.classify(message) == intent
+
+
+@pytest.mark.parametrize("message", [
+    "I am happy today",
+    "is this a curse",
+    "my prince charming",
+    "what is the source",
+    "a corpse in the library",
+])
+def test_real_words_are_not_typos(engine, message):
+    assert engine.classify(message) == GENERAL
+
+
+def test_known_words_are_not_typos():
+    engine = IntentEngine(known_words=["coursed"])
+    assert engine.classify("the river coursed on") == GENERAL
+    assert IntentEngine().classify("the river coursed on") == PROGRAMS
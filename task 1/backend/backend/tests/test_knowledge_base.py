@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from services.knowledge_base import DEFAULT_PATH, KnowledgeBase
+
+
+@pytest.fixture
+def kb_path(tmp_path):
+    path = tmp_path / "knowledge_base.json"
+    shutil.copy(DEFAULT_PATH, path)
+    return path
+
+
+def _edit(path, change):
+    data = json.loads(path.read_text())
+    change(data)
+    path.write_text(json.dumps(data))
+
+
+def test_reload_swaps_in_a_new_version(kb_path):
+    kb = KnowledgeBase(str(kb_path))
+    seen = []
+    kb.add_listener(seen.append)
+    old = kb.snapshot
+
+    _edit(kb_path, lambda data: data["faqs"].append({"question": "Is there an app?", "answer": "Not yet."}))
+    assert asyncio.run(kb.reload())
+
+    assert kb.version != old.version
+    assert seen == [kb.snapshot]
+    assert kb.snapshot.faq_matcher.match("Is there an app?").answer == "Not yet."
+    # Requests holding the old snapshot keep a consistent view
+    assert old.faq_matcher.match("Is there an app?") is None
+
+
+def test_unchanged_content_keeps_the_version(kb_path):
+    kb = KnowledgeBase(str(kb_path))
+    _edit(kb_path, lambda data: None)
+    assert not asyncio.run(kb.reload())
+
+
+def test_invalid_file_keeps_serving_the_previous_version(kb_path):
+    kb = KnowledgeBase(str(kb_path))
+    version = kb.version
+    _edit(kb_path, lambda data: data.pop("faqs"))
+    assert not asyncio.run(kb.reload())
+    assert kb.version == version
+
+
+def test_watcher_retries_a_failed_reload_at_the_same_mtime(kb_path):
+    kb = KnowledgeBase(str(kb_path), poll_interval=0.01)
+    version = kb.version
+    mtime = os.path.getmtime(kb_path) + 10
+    data = json.loads(kb_path.read_text())
+    data["faqs"].append({"question": "Is there an app?", "answer": "Not yet."})
+    complete = json.dumps(data)
+
+    async def scenario():
+        kb.start()
+        # A half-written file, then the rest of the write within the same mtime tick
+        kb_path.write_text(complete[:100])
+        os.utime(kb_path, (mtime, mtime))
+        await asyncio.sleep(0.05)
+        failed = kb.last_error is not None
+        kb_path.write_text(complete)
+        os.utime(kb_path, (mtime, mtime))
+        await asyncio.sleep(0.05)
+        await kb.stop()
+        return failed
+
+    assert asyncio.run(scenario())
+    assert kb.version != version
+    assert kb.last_error is None
@@ -0,0 +1,25 @@
+from services.lifecycle import DRAINING, SERVING, WARMING, Lifecycle
+
+
+def test_only_serving_is_ready():
+    lifecycle = Lifecycle(grace_seconds=1)
+    assert not lifecycle.ready
+    lifecycle.set(WARMING)
+    assert not lifecycle.ready
+    lifecycle.set(SERVING)
+    assert lifecycle.ready
+    lifecycle.set(DRAINING)
+    assert not lifecycle.ready
+    assert lifecycle.stats()["state"] == DRAINING
+
+
+def test_readiness_probe_follows_the_lifecycle(app_client, monkeypatch):
+    import main
+
+    assert app_client.get("/api/health/ready").status_code == 200
+    monkeypatch.setattr(main.lifecycle, "state", DRAINING)
+    response = app_client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+    # Liveness holds while draining
+    assert app_client.get("/api/health/live").status_code == 200
@@ -0,0 +1,289 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from services.llm_client import LLMClient, LLMOverloadedError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import services.circuit_breaker as circuit_breaker
+
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker(**overrides) -> CircuitBreaker:
+    options = dict(window_seconds=30, min_calls=4, error_rate=0.5, slow_seconds=5, slow_rate=0.8,
+                   open_seconds=10, probes=1)
+    options.update(overrides)
+    return CircuitBreaker("test-model", **options)
+
+
+def _trip(breaker: CircuitBreaker):
+    for _ in range(breaker.min_calls):
+        breaker.before_call()
+        breaker.record(False, 0.1)
+
+
+def test_breaker_opens_on_error_rate(clock):
+    breaker = _breaker()
+    for ok in (True, False, True):
+        breaker.before_call()
+        breaker.record(ok, 0.1)
+    # Not enough calls yet to judge
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.available()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_opens_on_slow_calls(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 6)
+    assert breaker.state == OPEN
+
+
+def test_breaker_forgets_calls_outside_the_window(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record(False, 0.1)
+    clock[0] += 31
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 10
+    assert breaker.available()
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.available()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock[0] += 10
+    breaker.before_call()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_is_released(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 10
+    breaker.before_call()
+    breaker.cancel()
+    assert breaker.available()
+
+
+def test_open_circuit_fails_fast_without_waiting_for_a_slot(fake_llm):
+    async def scenario():
+        fake_llm.delay = 1
+        client = LLMClient("primary", max_concurrency=1, timeout=5)
+        _trip(client.breaker)
+        # The slot is busy with another call
+        client.breaker.state = CLOSED
+        busy = asyncio.ensure_future(client.complete([{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.05)
+        client.breaker._trip()
+
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await client.complete([{"role": "user", "content": "hi"}])
+        with pytest.raises(CircuitOpenError):
+            async for _ in client.stream([{"role": "user", "content": "hi"}]):
+                pass
+        elapsed = time.perf_counter() - started
+        busy.cancel()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.1
+
+
+def test_open_primary_goes_straight_to_the_hedge_model(fake_llm):
+    async def scenario():
+        fake_llm.reply = lambda model, messages: f"from {model}"
+        client = LLMClient("primary", hedge_model="secondary", timeout=5)
+        _trip(client.breaker)
+        return await client.complete([{"role": "user", "content": "hi"}])
+
+    assert asyncio.run(scenario()) == "from secondary"
+
+
+def test_slow_primary_is_hedged(fake_llm):
+    async def scenario():
+        async def acompletion(model, messages, stream=False, **kwargs):
+            await asyncio.sleep(1 if model == "primary" else 0.01)
+            return await fake_llm(model, messages, stream=stream, **kwargs)
+
+        fake_llm.reply = lambda model, messages: f"from {model}"
+        client = LLMClient("primary", hedge_model="secondary", hedge_delay=0.05, timeout=5)
+        client._acompletion = acompletion
+        started = time.perf_counter()
+        answer = await client.complete([{"role": "user", "content": "hi"}])
+        return answer, time.perf_counter() - started, client.stats()
+
+    answer, elapsed, stats = asyncio.run(scenario())
+    assert answer == "from secondary"
+    assert elapsed < 0.5
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_concurrent_calls_overlap_up_to_the_cap(fake_llm):
+    running = peak = 0
+
+    async def acompletion(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return await fake_llm(**kwargs)
+
+    async def scenario():
+        client = LLMClient("primary", max_concurrency=3, timeout=5)
+        client._acompletion = acompletion
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        answers = await asyncio.gather(*(client.complete([{"role": "user", "content": "hi"}]) for _ in range(6)))
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return answers, elapsed, ticks, client.stats()
+
+    answers, elapsed, ticks, stats = asyncio.run(scenario())
+    assert answers == ["fake answer"] * 6
+    assert peak == 3
+    # Two waves of three, not six calls one after another
+    assert elapsed < 0.25
+    # The event loop kept running while the calls were in flight
+    assert ticks >= 5
+    assert stats["in_flight"] == stats["waiting"] == 0
+
+
+def test_slow_completion_times_out_and_frees_its_slot(fake_llm):
+    async def scenario():
+        fake_llm.delay = 1
+        client = LLMClient("primary", max_concurrency=1, timeout=0.05)
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await client.complete([{"role": "user", "content": "hi"}])
+        elapsed = time.perf_counter() - started
+        fake_llm.delay = 0
+        return elapsed, await client.complete([{"role": "user", "content": "hi"}])
+
+    elapsed, answer = asyncio.run(scenario())
+    assert elapsed < 0.5
+    assert answer == "fake answer"
+
+
+def test_waiting_for_a_slot_times_out(fake_llm):
+    async def scenario():
+        fake_llm.delay = 0.3
+        client = LLMClient("primary", max_concurrency=1, timeout=0.1)
+        busy = asyncio.ensure_future(client.complete([{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await client.complete([{"role": "user", "content": "hi"}])
+        waiting = client.stats()["waiting"]
+        with pytest.raises(asyncio.TimeoutError):
+            await busy
+        return waiting
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_full_queue_is_rejected(fake_llm):
+    async def scenario():
+        fake_llm.delay = 0.2
+        client = LLMClient("primary", max_concurrency=1, max_queue=1, timeout=5)
+        calls = [client.complete([{"role": "user", "content": "hi"}]) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(r, LLMOverloadedError) for r in results) == 1
+    assert results.count("fake answer") == 2
+
+
+def test_streamed_usage_is_recorded(fake_llm):
+    async def scenario():
+        client = LLMClient("primary", timeout=5)
+        tokens = [token async for token in client.stream([{"role": "user", "content": "hi"}])]
+        return tokens, client.stats()
+
+    tokens, stats = asyncio.run(scenario())
+    assert "".join(tokens).strip() == "fake answer"
+    assert fake_llm.calls[0]["stream_options"] == {"include_usage": True}
+    assert stats["prompt_tokens"] == 100
+    assert stats["completion_tokens"] == 20
+
+
+def _stalling_stream(tokens_before_stall: int):
+    """acompletion whose stream opens at once but stops producing after some tokens"""
+    async def acompletion(**kwargs):
+        async def chunks():
+            for index in range(tokens_before_stall):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f"t{index} "))])
+            await asyncio.sleep(10)
+
+        return chunks()
+
+    return acompletion
+
+
+def test_stream_that_never_sends_a_token_times_out():
+    async def scenario():
+        client = LLMClient("primary", timeout=0.05, stream_idle_timeout=5)
+        client._acompletion = _stalling_stream(0)
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in client.stream([{"role": "user", "content": "hi"}]):
+                pass
+        return time.perf_counter() - started, client.stats()
+
+    elapsed, stats = asyncio.run(scenario())
+    assert elapsed < 1
+    assert stats["in_flight"] == 0
+
+
+def test_stream_that_stalls_after_the_first_token_times_out():
+    async def scenario():
+        client = LLMClient("primary", timeout=5, stream_idle_timeout=0.05)
+        client._acompletion = _stalling_stream(2)
+        tokens = []
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            async for token in client.stream([{"role": "user", "content": "hi"}]):
+                tokens.append(token)
+        return tokens, time.perf_counter() - started, client.stats()
+
+    tokens, elapsed, stats = asyncio.run(scenario())
+    assert tokens == ["t0 ", "t1 "]
+    assert elapsed < 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from services.llm_transport import RecordReplayTransport, ReplayMissError, request_key
+
+
+def test_replayed_stream_keeps_usage(fake_llm, tmp_path):
+    path = str(tmp_path / "recordings.jsonl.gz")
+    request = {
+        "model": "primary",
+        "messages": [{"role": "user", "content": "hi"}],
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+
+    async def consume(transport):
+        chunks = [chunk async for chunk in await transport.acompletion(fake_llm, **request)]
+        text = "".join(c.choices[0].delta.content for c in chunks if c.choices)
+        return text, chunks[-1].usage
+
+    recorded = asyncio.run(consume(RecordReplayTransport("record", path)))
+    replayed = asyncio.run(consume(RecordReplayTransport("replay", path, speed=0)))
+
+    assert replayed[0] == recorded[0] == "fake answer "
+    assert (replayed[1].prompt_tokens, replayed[1].completion_tokens) == (100, 20)
+
+
+def test_replay_miss_is_reported(tmp_path):
+    transport = RecordReplayTransport("replay", str(tmp_path / "missing.jsonl.gz"), speed=0)
+
+    async def call():
+        await transport.acompletion(None, model="primary", messages=[{"role": "user", "content": "hi"}])
+
+    with pytest.raises(ReplayMissError):
+        asyncio.run(call())
+    assert transport.stats()["misses"] == 1
+
+
+def test_request_key_ignores_connection_details():
+    base = {"model": "primary", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.7}
+    assert request_key(base) == request_key({**base, "timeout": 5, "api_base": "http://stub"})
+    assert request_key(base) != request_key({**base, "temperature": 0.2})
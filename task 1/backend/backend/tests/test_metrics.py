@@ -0,0 +1,39 @@
+import uuid
+
+from services.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo", ("kind",), buckets=(0.1, 1)))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "chat")
+
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{kind="chat",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{kind="chat",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{kind="chat",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{kind="chat"} 3' in lines
+    assert "# TYPE demo_seconds histogram" in lines
+
+
+def test_counter_tracks_each_label_set():
+    counter = Counter("demo_total", "Demo", ("source",))
+    counter.inc("faq")
+    counter.inc("llm", amount=3)
+    lines = counter.render()
+    assert 'demo_total{source="faq"} 1' in lines
+    assert 'demo_total{source="llm"} 3' in lines
+
+
+def test_chat_requests_show_up_in_the_metrics_endpoint(app_client):
+    def answered(text):
+        prefix = 'ironlady_request_seconds_count{endpoint="chat"} '
+        return next((float(line[len(prefix):]) for line in text.splitlines() if line.startswith(prefix)), 0)
+
+    before = answered(app_client.get("/metrics").text)
+    app_client.post("/api/chat", json={"message": f"hello {uuid.uuid4()}"})
+    response = app_client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert answered(response.text) == before + 1
@@ -0,0 +1,47 @@
+import pytest
+
+from services.history import SUMMARY_ROLE
+from services.intent import IntentEngine
+from services.model_router import COMPLEX, GREETING, SIMPLE, ModelRouter
+
+
+@pytest.fixture
+def router():
+    return ModelRouter("primary", "fast", IntentEngine(), enabled=True)
+
+
+def _user(text):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.mark.parametrize("message, tier", [
+    ("hi there!", GREETING),
+    ("What programs do you offer?", SIMPLE),
+    ("How much are the fees?", SIMPLE),
+    ("Should I ask my boss for a promotion?", COMPLEX),
+    ("Tell me something interesting", COMPLEX),
+    ("What programs " + "really " * 30 + "exist?", COMPLEX),
+])
+def test_routes_by_message(router, message, tier):
+    route = router.route(_user(message))
+    assert route.tier == tier
+    assert route.model == ("primary" if tier == COMPLEX else "fast")
+    assert route.max_tokens == router.budgets[tier]
+
+
+def test_deep_conversations_use_the_primary_model(router):
+    conversation = []
+    for _ in range(router.fast_max_turns):
+        conversation += [{"role": "user", "content": "what are the fees"}, {"role": "assistant", "content": "..."}]
+    assert router.route(conversation + _user("What programs do you offer?")).tier == COMPLEX
+
+    # A rolling summary counts as several earlier turns
+    summarized = [{"role": SUMMARY_ROLE, "content": "earlier turns"}] + _user("What programs do you offer?")
+    assert router.route(summarized).tier == COMPLEX
+
+
+def test_disabled_router_always_uses_the_primary_model():
+    router = ModelRouter("primary", "fast", IntentEngine(), enabled=False)
+    route = router.route(_user("hi"))
+    assert (route.tier, route.model) == (COMPLEX, "primary")
+    assert router.stats()["routed"][COMPLEX] == 1
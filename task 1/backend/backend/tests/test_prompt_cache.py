@@ -0,0 +1,40 @@
+import asyncio
+
+from services.prompt_cache import PromptCache, is_cache_error
+
+
+def test_only_cache_errors_are_recognised():
+    assert is_cache_error(Exception("404 CachedContent not found (or permission denied)"))
+    assert is_cache_error(Exception("400 INVALID_ARGUMENT: cached content has expired"))
+    assert not is_cache_error(asyncio.TimeoutError())
+    assert not is_cache_error(Exception("429 Resource exhausted"))
+
+
+def test_rejected_handle_is_recreated_immediately(monkeypatch):
+    created = []
+
+    def create(system_prompt):
+        created.append(system_prompt)
+        return f"cache-{len(created)}"
+
+    async def scenario():
+        # The periodic renewal is far away, so only reject() can recreate the cache
+        cache = PromptCache("model", ttl_seconds=3600, enabled=True)
+        monkeypatch.setattr(cache, "_create", create)
+        cache.start(lambda: "system prompt")
+        while cache.handle is None:
+            await asyncio.sleep(0.01)
+
+        kept = cache.reject("cache-1", RuntimeError("upstream timed out"))
+        handle_after_timeout = cache.handle
+        dropped = cache.reject("cache-1", RuntimeError("404 CachedContent not found"))
+        while cache.handle is None:
+            await asyncio.sleep(0.01)
+        await cache.stop()
+        return kept, handle_after_timeout, dropped, cache.handle
+
+    kept, handle_after_timeout, dropped, handle = asyncio.run(scenario())
+    assert not kept
+    assert handle_after_timeout == "cache-1"
+    assert dropped
+    assert handle == "cache-2"
@@ -0,0 +1,58 @@
+import pytest
+
+from services.response_cache import AnswerCache
+
+VERSION = "v1"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Can I join as a man?", "Can I join as a woman?"),
+    ("Is the program online?", "Is the program offline?"),
+    ("Is the program online?", "Is the program not online?"),
+    ("Do you offer scholarships?", "Do you offer no scholarships?"),
+    ("Is the course free?", "Isn't the course free?"),
+])
+def test_opposite_questions_do_not_share_answers(cached, asked):
+    cache = AnswerCache(similarity=0.7)
+    cache.put(cached, VERSION, "cached answer")
+    assert cache.get(asked, VERSION) is None
+    assert cache.near_hits == 0
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What programs do you offer?", "which programs do you offer"),
+    ("Do you offer any scholarships?", "do you offer scholarship"),
+])
+def test_rephrased_questions_share_answers(cached, asked):
+    cache = AnswerCache(similarity=0.7)
+    cache.put(cached, VERSION, "cached answer")
+    assert cache.get(asked, VERSION) == "cached answer"
+    assert cache.near_hits == 1
+
+
+def test_answers_are_bound_to_the_knowledge_base_version():
+    cache = AnswerCache()
+    cache.put("What programs do you offer?", VERSION, "cached answer")
+    assert cache.get("What programs do you offer?", "v2") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_degraded_answer_does_not_reuse_an_opposite_question(app_client):
+    import main
+
+    service = main.chatbot_service
+    service.answer_cache.invalidate()
+    service._cache_answer("Is the program online?", "Yes, fully online.")
+
+    assert service._degraded_response("Is the program online?", "general") == "Yes, fully online."
+    assert service._degraded_response("Is the program not online?", "general") != "Yes, fully online."
+
+
+def test_stale_best_match_does_not_hide_a_fresh_one():
+    cache = AnswerCache(similarity=0.7)
+    cache.put("Which programs do you offer, please?", "v0", "outdated answer")
+    cache.put("What programs do you offer?", VERSION, "current answer")
+    # The outdated question is the closer match, but only the current one may answer
+    assert cache.get("which programs do you offer", VERSION) == "current answer"
+    assert cache.near_hits == 1
+    assert cache.stats()["entries"] == 1
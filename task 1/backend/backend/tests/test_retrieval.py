@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from services.knowledge_base import DEFAULT_PATH
+from services.retrieval import KnowledgeIndex, stem, tokenize
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(DEFAULT_PATH) as f:
+        return KnowledgeIndex(json.load(f), top_k=3)
+
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize("How do I enroll in the programs?") == ["enroll", "program"]
+    assert stem("enrollment") == stem("enrolling") == "enroll"
+    assert stem("business") == "business"
+
+
+def test_search_ranks_the_matching_chunk_first(index):
+    results = index.search("payment options and fees")
+    assert results[0].title == "Payment options, fees and investment"
+    assert len(results) <= 3
+
+
+def test_search_without_known_terms_is_empty(index):
+    assert index.search("zzzz qqqq") == []
+
+
+def test_context_lists_each_chunk(index):
+    context = KnowledgeIndex.format_context(index.search("enrollment steps", top_k=2))
+    assert context.count("• ") == 2
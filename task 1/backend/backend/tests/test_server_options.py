@@ -0,0 +1,20 @@
+import main
+
+
+def test_single_worker_by_default_with_memory_conversations(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("CONVERSATION_BACKEND", "memory")
+    assert main.server_options()["workers"] == 1
+
+
+def test_all_cores_with_shared_conversations(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("CONVERSATION_BACKEND", "sqlite")
+    monkeypatch.setattr(main.os, "cpu_count", lambda: 6)
+    assert main.server_options()["workers"] == 6
+
+
+def test_explicit_worker_count_wins(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("CONVERSATION_BACKEND", "memory")
+    assert main.server_options()["workers"] == 3
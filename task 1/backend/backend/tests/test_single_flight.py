@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight(follower_timeout=1)
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        return results, flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_follower_timeout_leaves_the_shared_call_running():
+    async def work():
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight(follower_timeout=0.01)
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("key", work)
+        return await leader, flight.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == "result"
+    assert stats["follower_timeouts"] == 1
+
+
+def test_streams_fan_out_every_token():
+    calls = []
+
+    async def tokens():
+        calls.append(1)
+        for token in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield token
+
+    async def consume(flight):
+        return [token async for token in flight.stream("key", tokens)]
+
+    async def scenario():
+        flight = SingleFlight(follower_timeout=1)
+        leader = asyncio.ensure_future(consume(flight))
+        # Joins after the first token was produced
+        await asyncio.sleep(0.015)
+        follower = await consume(flight)
+        return await leader, follower, flight.stats()
+
+    leader, follower, stats = asyncio.run(scenario())
+    assert leader == follower == ["a", "b", "c"]
+    assert len(calls) == 1
+    assert stats["coalesced"] == 1
+
+
+def test_stream_errors_reach_every_subscriber():
+    async def tokens():
+        yield "a"
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def consume(flight):
+        received = []
+        with pytest.raises(RuntimeError):
+            async for token in flight.stream("key", tokens):
+                received.append(token)
+        return received
+
+    async def scenario():
+        flight = SingleFlight(follower_timeout=1)
+        return await asyncio.gather(consume(flight), consume(flight))
+
+    assert asyncio.run(scenario()) == [["a"], ["a"]]
+
+
+def test_identical_streamed_questions_share_one_llm_call(app_client, fake_llm):
+    import main
+
+    service = main.chatbot_service
+    fake_llm.delay = 0.05
+    question = f"how do I grow as a leader {uuid.uuid4()}"
+
+    async def ask():
+        return [
+            event["data"]["text"]
+            async for event in service.stream_message(question)
+            if event["event"] == "token"
+        ]
+
+    async def scenario():
+        return await asyncio.gather(ask(), ask())
+
+    first, second = app_client.portal.call(scenario)
+    assert "".join(first).strip() == "".join(second).strip() == "fake answer"
+    assert len(fake_llm.calls) == 1
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from services.startup import StartupReport
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_does_not_load_the_provider_stack():
+    # A fresh interpreter, since other tests may already have imported litellm
+    env = {**os.environ, "WARMUP_ENABLED": "false"}
+    env.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('litellm' in sys.modules)"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_startup_report_records_phases():
+    report = StartupReport()
+    report.mark("imports")
+    report.ready()
+    report.record_background("provider_import", 1.5)
+
+    stats = report.stats()
+    assert list(stats["phases_ms"]) == ["imports", "lifespan_start"]
+    assert stats["ready_ms"] is not None
+    assert stats["background_ms"] == {"provider_import": 1500.0}
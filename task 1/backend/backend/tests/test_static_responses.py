@@ -0,0 +1,32 @@
+import gzip
+import json
+
+
+def test_programs_support_conditional_get(app_client):
+    first = app_client.get("/api/programs", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert "programs" in first.json()
+    etag = first.headers["etag"]
+
+    again = app_client.get("/api/programs", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    other = app_client.get("/api/programs", headers={"If-None-Match": '"stale"'})
+    assert other.status_code == 200
+
+
+def test_gzip_variant_matches_the_identity_body(app_client):
+    plain = app_client.get("/api/quick-questions", headers={"Accept-Encoding": "identity"})
+    # Read the raw body so the client does not undo the encoding
+    with app_client.stream("GET", "/api/quick-questions", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+
+    assert json.loads(gzip.decompress(raw)) == plain.json()
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_refused_encodings_are_not_used(app_client):
+    response = app_client.get("/api/quick-questions", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in response.headers
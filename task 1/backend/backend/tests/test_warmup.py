@@ -0,0 +1,30 @@
+def test_warm_up_caches_answers_for_every_question(app_client, fake_llm):
+    import main
+    from services.warmup import AnswerWarmer
+
+    service = main.chatbot_service
+    service.answer_cache.invalidate()
+    fake_llm.reply = lambda model, messages: f"warm answer to {messages[-1]['content']}"
+    warmer = AnswerWarmer(service, lambda: ["Which program suits a new manager?"], concurrency=2)
+
+    app_client.portal.call(warmer.run_once)
+
+    questions = warmer.all_questions()
+    assert len(questions) == 1 + 2 * len(service.knowledge_base.programs)
+    assert (warmer.state, warmer.completed, warmer.failed) == ("done", len(questions), 0)
+    assert service._cached_answer("Which program suits a new manager?").startswith("warm answer")
+
+
+def test_warm_up_counts_failures(app_client, fake_llm):
+    import main
+    from services.warmup import AnswerWarmer
+
+    def reply(model, messages):
+        raise RuntimeError("upstream down")
+
+    fake_llm.reply = reply
+    warmer = AnswerWarmer(main.chatbot_service, lambda: ["Which program suits a new manager?"])
+    warmer.all_questions = lambda: ["Which program suits a new manager?"]
+
+    app_client.portal.call(warmer.run_once)
+    assert (warmer.completed, warmer.failed) == (0, 1)